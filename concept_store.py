@@ -0,0 +1,112 @@
+import threading
+
+from kg_ingest import canonical_key, PLACEHOLDER_RESOURCE_URL
+from kg_retrieval import KnowledgeGraphIndex
+
+
+class ConceptStore:
+    """
+    Concepts shared across every knowledge graph the app knows about, keyed by
+    canonical concept name. Each concept keeps the union of the prerequisites and
+    resources it was given by any graph. Graphs keep their own resource lists, so
+    one topic's resources never leak into another's. With a resource registry, the
+    resource dicts are interned, so a URL listed by several concepts and topics is
+    held once.
+    """
+
+    def __init__(self, resource_registry=None):
+        self.resource_registry = resource_registry
+        self.concepts = {}  # canonical key -> {"name", "prerequisites": [key], "resources": [dict]}
+        self.lock = threading.Lock()
+        self._index = None  # retrieval index over the store, rebuilt lazily after changes
+
+    def add_graph(self, knowledge_graph: dict):
+        """
+        Merges a normalized knowledge graph into the store. With a resource registry,
+        the graph's resource dicts are replaced by the interned ones; its lists stay its own.
+        """
+        with self.lock:
+            for name, data in knowledge_graph.items():
+                entry = self.concepts.setdefault(canonical_key(name), {"name": name, "prerequisites": [], "resources": []})
+                for prereq in data.get('prerequisites', []):
+                    prereq_key = canonical_key(prereq)
+                    if prereq_key not in entry["prerequisites"]:
+                        entry["prerequisites"].append(prereq_key)
+
+                resources = [r for r in data.get('resources', []) if isinstance(r, dict)]
+                if self.resource_registry is not None:
+                    interned = []
+                    seen = set()
+                    for resource in resources:
+                        resource = self.resource_registry.intern(resource)
+                        if id(resource) not in seen:
+                            seen.add(id(resource))
+                            interned.append(resource)
+                    # A new list of the graph's own: other graphs and the store's union are not affected
+                    data['resources'] = resources = interned
+
+                known_urls = {r.get('url') for r in entry["resources"]}
+                known_resources = {id(r) for r in entry["resources"]}
+                for resource in resources:
+                    url = resource.get('url')
+                    if id(resource) in known_resources:
+                        continue
+                    if url == PLACEHOLDER_RESOURCE_URL or url not in known_urls:
+                        entry["resources"].append(resource)
+                        known_urls.add(url)
+                        known_resources.add(id(resource))
+            self._index = None
+
+    def _as_graph(self) -> dict:
+        # Caller holds self.lock
+        return {
+            entry["name"]: {
+                "prerequisites": [self.concepts[p]["name"] for p in entry["prerequisites"] if p in self.concepts],
+                "resources": entry["resources"],
+            }
+            for entry in self.concepts.values()
+        }
+
+    def find(self, name: str) -> dict:
+        """
+        Returns the stored concept for a name (matched canonically), or None.
+        """
+        with self.lock:
+            return self.concepts.get(canonical_key(name))
+
+    def subgraph(self, names) -> dict:
+        """
+        Returns the named concepts plus all of their prerequisites, transitively,
+        as a new knowledge graph (resource dicts are shared, the lists are not).
+        """
+        with self.lock:
+            keys = [canonical_key(name) for name in names]
+            selected = []
+            seen = set()
+            while keys:
+                key = keys.pop()
+                if key in seen or key not in self.concepts:
+                    continue
+                seen.add(key)
+                selected.append(key)
+                keys.extend(self.concepts[key]["prerequisites"])
+
+            return {
+                self.concepts[key]["name"]: {
+                    "prerequisites": [self.concepts[p]["name"] for p in self.concepts[key]["prerequisites"] if p in seen],
+                    "resources": list(self.concepts[key]["resources"]),
+                }
+                for key in reversed(selected)
+            }
+
+    def related_concepts(self, topic: str, top_k: int = 12) -> dict:
+        """
+        Returns the stored concepts most relevant to a topic, with their prerequisites,
+        as a knowledge graph. Empty when nothing in the store matches.
+        """
+        with self.lock:
+            if self._index is None:
+                self._index = KnowledgeGraphIndex(self._as_graph())
+            index = self._index
+        hits = [name for name, _ in index.search(topic, top_k)]
+        return self.subgraph(hits)
@@ -0,0 +1,113 @@
+import re
+
+# Upper bound on suggestions per query; trie nodes precompute this many ranked candidates
+MAX_SUGGESTIONS = 10
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+")
+
+
+def concept_tokens(text: str) -> list:
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+class _Node:
+    __slots__ = ("children", "ids", "ranked")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()  # concepts under this prefix (token trie only)
+        self.ranked = []  # the best MAX_SUGGESTIONS concepts under this prefix
+
+
+class ConceptTrie:
+    """
+    Prefix index over the concept names of one knowledge graph, for autocomplete.
+    Two tries are kept: one over whole names (so "deep le" finds "Deep Learning Basics")
+    and one over the words of each name (so "regr" finds "Linear Regression").
+    Every node stores its best candidates pre-ranked, so a lookup costs the length of
+    the query, not the size of the graph. Shorter names rank first, then graph order.
+    """
+
+    def __init__(self, concept_names):
+        self.names = list(concept_names)
+        self.by_lower_name = {}
+        self.name_root = _Node()
+        self.token_root = _Node()
+
+        for concept_id, name in enumerate(self.names):
+            self.by_lower_name.setdefault(str(name).strip().lower(), concept_id)
+
+        # Inserting best-ranked concepts first fills every node's ranked list without sorting
+        for concept_id in sorted(range(len(self.names)), key=self._rank):
+            normalized = " ".join(concept_tokens(self.names[concept_id]))
+            self._insert(self.name_root, normalized, concept_id, keep_ids=False)
+            for token in set(normalized.split()):
+                self._insert(self.token_root, token, concept_id, keep_ids=True)
+
+    def _rank(self, concept_id: int) -> tuple:
+        return (len(self.names[concept_id]), concept_id)
+
+    @staticmethod
+    def _insert(root: _Node, key: str, concept_id: int, keep_ids: bool):
+        node = root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+            node = child
+            if keep_ids:
+                node.ids.add(concept_id)
+            if len(node.ranked) < MAX_SUGGESTIONS:
+                node.ranked.append(concept_id)
+
+    @staticmethod
+    def _find(root: _Node, key: str):
+        node = root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, name: str):
+        """
+        Returns the concept named exactly like name (ignoring case and surrounding space), or None.
+        """
+        concept_id = self.by_lower_name.get(str(name).strip().lower())
+        return None if concept_id is None else self.names[concept_id]
+
+    def suggest(self, query: str, limit: int = MAX_SUGGESTIONS) -> list:
+        """
+        Returns up to limit concept names matching the query, best first: names that
+        start with the query, then names with a word starting with each query word.
+        """
+        limit = max(0, min(limit, MAX_SUGGESTIONS))
+        tokens = concept_tokens(query)
+        if not tokens or limit == 0:
+            return []
+
+        suggestions = []
+        name_node = self._find(self.name_root, " ".join(tokens))
+        if name_node is not None:
+            suggestions.extend(name_node.ranked[:limit])
+
+        if len(suggestions) < limit:
+            token_nodes = [self._find(self.token_root, token) for token in tokens]
+            if all(node is not None for node in token_nodes):
+                if len(token_nodes) == 1:
+                    candidates = token_nodes[0].ranked
+                else:
+                    # Every query word has to prefix some word of the name; intersect the smallest sets first
+                    token_nodes.sort(key=lambda node: len(node.ids))
+                    matching = set(token_nodes[0].ids)
+                    for node in token_nodes[1:]:
+                        matching &= node.ids
+                    candidates = sorted(matching, key=self._rank)
+                already = set(suggestions)
+                for concept_id in candidates:
+                    if concept_id not in already:
+                        suggestions.append(concept_id)
+                        if len(suggestions) >= limit:
+                            break
+
+        return [self.names[concept_id] for concept_id in suggestions]
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import threading
+
+from concept_trie import ConceptTrie
+
+# How many superseded versions of each topic's graph stay available to pinned requests
+MAX_PINNED_VERSIONS = 4
+
+
+class GraphVersion:
+    """
+    One published version of a topic's knowledge graph. Published graphs are never
+    modified (copy-on-write), so a version can be read without locks and its
+    serialized body and ETag are computed once. The concept name trie used for
+    autocomplete and goal matching is built with the version.
+    """
+
+    __slots__ = ("topic", "version", "knowledge_graph", "validation_report", "concept_trie", "_body", "_etag")
+
+    def __init__(self, topic: str, version: int, knowledge_graph: dict, validation_report: dict = None, concept_trie: ConceptTrie = None):
+        self.topic = topic
+        self.version = version
+        self.knowledge_graph = knowledge_graph
+        self.validation_report = validation_report
+        self.concept_trie = concept_trie if concept_trie is not None else ConceptTrie(knowledge_graph)
+        self._body = None
+        self._etag = None
+
+    def body(self) -> str:
+        """
+        Returns the graph serialized as JSON, computed on first use.
+        """
+        if self._body is None:
+            body = json.dumps(self.knowledge_graph)
+            self._etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+            self._body = body
+        return self._body
+
+    def etag(self) -> str:
+        if self._etag is None:
+            self.body()
+        return self._etag
+
+
+class GraphRegistry:
+    """
+    Knowledge graphs keyed by topic (or tenant), each with a version history.
+    Writers publish a complete new graph, which replaces the topic's current version
+    in a single reference swap. Readers take the current version without locking and
+    keep using it for the whole request, even if a newer version is published meanwhile.
+    Requests can also pin a recent version by number.
+    """
+
+    def __init__(self, max_pinned_versions: int = MAX_PINNED_VERSIONS):
+        self.max_pinned_versions = max_pinned_versions
+        self.current_versions = {}  # topic -> GraphVersion, read without the lock
+        self.history = {}  # topic -> (GraphVersion, ...) newest last, including the current one
+        self.write_lock = threading.Lock()
+
+    def current(self, topic: str):
+        """
+        Returns the current GraphVersion of a topic, or None if none was published.
+        """
+        return self.current_versions.get(topic)
+
+    def get(self, topic: str, version: int):
+        """
+        Returns a specific recent version of a topic's graph, or None if it is unknown or expired.
+        """
+        for graph_version in self.history.get(topic, ()):
+            if graph_version.version == version:
+                return graph_version
+        return None
+
+    def publish(self, topic: str, knowledge_graph: dict, validation_report: dict = None) -> GraphVersion:
+        """
+        Publishes a new graph for a topic and returns its version. The registry takes
+        ownership of the graph: callers must not modify it afterwards.
+        """
+        # Build the trie before taking the lock, so concurrent publishes do not wait on it
+        concept_trie = ConceptTrie(knowledge_graph)
+        with self.write_lock:
+            previous = self.current_versions.get(topic)
+            graph_version = GraphVersion(topic, previous.version + 1 if previous else 1, knowledge_graph, validation_report, concept_trie)
+            self.history[topic] = (self.history.get(topic, ()) + (graph_version,))[-self.max_pinned_versions:]
+            self.current_versions[topic] = graph_version
+        return graph_version
+
+    def topics(self) -> list:
+        return sorted(self.current_versions)
@@ -0,0 +1,18 @@
+# Gunicorn settings for serving either app with cooperative (event-loop based) workers:
+#   gunicorn learning_path_advanced:app
+#   gunicorn learning_path:app
+# Each gevent worker is a single process whose blocking socket I/O (the Gemini calls made
+# through `requests`) is monkey-patched to yield to other requests, so one worker holds
+# hundreds of in-flight LLM calls instead of one per thread.
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+worker_class = "gevent"
+# All app state (graph caches, jobs, learner progress, path cache) lives in the worker process,
+# so a single worker is the default; more workers would each see different state.
+workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+# Concurrent requests (greenlets) per worker
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", "1000"))
+# Knowledge graph generation can take tens of seconds upstream
+timeout = int(os.environ.get("WORKER_TIMEOUT", "120"))
+keepalive = 5
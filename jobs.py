@@ -0,0 +1,101 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class JobManager:
+    """
+    Runs long tasks (e.g. knowledge graph generation) on a bounded worker pool.
+    Jobs are deduplicated by key: submitting a key that already has a queued or
+    running job returns that job instead of starting another one. Finished jobs
+    are kept for `retention_seconds` so clients can still poll their result.
+    """
+
+    def __init__(self, max_workers: int = 4, retention_seconds: int = 600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.retention_seconds = retention_seconds
+        self.jobs = {}
+        self.active_by_key = {}
+        self.changed = threading.Condition()
+
+    def submit(self, key: str, func, *args) -> tuple:
+        """
+        Starts func(*args) as a job for key unless one is already in flight.
+        Returns (job, created) where created tells whether a new job was started.
+        """
+        with self.changed:
+            self._prune()
+            job_id = self.active_by_key.get(key)
+            if job_id is not None:
+                return dict(self.jobs[job_id]), False
+
+            job_id = uuid.uuid4().hex
+            self.jobs[job_id] = {
+                "job_id": job_id,
+                "key": key,
+                "status": JOB_QUEUED,
+                "result": None,
+                "error": None,
+                "created_at": time.time(),
+                "finished_at": None,
+            }
+            self.active_by_key[key] = job_id
+            job = dict(self.jobs[job_id])
+
+        self.executor.submit(self._run, job_id, func, args)
+        return job, True
+
+    def get(self, job_id: str) -> dict:
+        """
+        Returns a snapshot of the job, or None if it is unknown or expired.
+        """
+        with self.changed:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_change(self, job_id: str, last_status: str, timeout: float) -> dict:
+        """
+        Blocks until the job's status differs from last_status or the timeout elapses,
+        then returns a snapshot of the job (None if it is unknown or expired).
+        """
+        with self.changed:
+            self.changed.wait_for(
+                lambda: job_id not in self.jobs or self.jobs[job_id]["status"] != last_status,
+                timeout=timeout,
+            )
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _update(self, job_id: str, **fields):
+        with self.changed:
+            job = self.jobs[job_id]
+            job.update(fields)
+            if job["status"] in FINISHED_STATES:
+                job["finished_at"] = time.time()
+                self.active_by_key.pop(job["key"], None)
+            self.changed.notify_all()
+
+    def _run(self, job_id: str, func, args):
+        self._update(job_id, status=JOB_RUNNING)
+        try:
+            result = func(*args)
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            self._update(job_id, status=JOB_FAILED, error=str(e))
+        else:
+            self._update(job_id, status=JOB_SUCCEEDED, result=result)
+
+    def _prune(self):
+        # Caller holds self.changed
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self.jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
@@ -0,0 +1,220 @@
+import re
+
+PLACEHOLDER_RESOURCE_URL = "https://example.com/placeholder_resource"
+
+# Abbreviations LLMs use interchangeably in concept names, expanded before comparing names
+ABBREVIATIONS = {
+    "intro": "introduction",
+    "fundamentals": "basics",
+    "fundamental": "basics",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+}
+
+PARENTHETICAL_PATTERN = re.compile(r"\s*\(([^)]*)\)\s*")
+# "+" and "#" are kept so "C", "C++" and "C#" stay distinct concepts
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9+#]+")
+
+
+def clean_name(name) -> str:
+    """
+    Trims a concept name and collapses internal whitespace.
+    """
+    return " ".join(str(name).split())
+
+
+def canonical_key(name: str) -> str:
+    """
+    Maps a concept name to the key used to detect near-duplicates,
+    e.g. "Intro to ML" and "Introduction to  ml" share a key.
+    """
+    words = NON_WORD_PATTERN.sub(" ", str(name).lower()).split()
+    expanded = []
+    for word in words:
+        expanded.extend(ABBREVIATIONS.get(word, word).split())
+    return " ".join(expanded)
+
+
+def alias_keys(name: str) -> list:
+    """
+    Returns every key a concept can be referred to by: its canonical key,
+    the key without any parenthetical, and the parenthetical itself
+    (so "NLP" resolves to "Natural Language Processing (NLP)").
+    """
+    keys = [canonical_key(name)]
+    without_parenthetical = PARENTHETICAL_PATTERN.sub(" ", name).strip()
+    if without_parenthetical and without_parenthetical != name:
+        keys.append(canonical_key(without_parenthetical))
+    for inner in PARENTHETICAL_PATTERN.findall(name):
+        keys.append(canonical_key(inner))
+    return [key for key in keys if key]
+
+
+def find_strongly_connected_components(graph: dict) -> list:
+    """
+    Tarjan's algorithm, iterative so deep prerequisite chains cannot hit the recursion limit.
+    graph maps each concept to its prerequisites; returns the list of components.
+    Runs in O(V + E).
+    """
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in graph:
+        if root in index_of:
+            continue
+        work = [(root, iter(graph.get(root, ())))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, successors = work[-1]
+            advanced = False
+            for successor in successors:
+                if successor not in index_of:
+                    index_of[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.get(successor, ()))))
+                    advanced = True
+                    break
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[successor])
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+
+    return components
+
+
+def normalize_knowledge_graph(raw_kg: dict) -> tuple:
+    """
+    Ingest stage for generated or uploaded knowledge graphs. It:
+    - coerces every concept to {"prerequisites": [str], "resources": [dict]},
+    - merges near-duplicate concept names and builds an alias map,
+    - resolves prerequisites through the alias map and drops dangling ones,
+    - breaks prerequisite cycles found by an SCC pass.
+    Returns (cleaned_graph, validation_report). The cleaned graph is acyclic and
+    every prerequisite names a concept in it; report["valid"] tells whether the
+    raw graph already was, i.e. nothing had to be dropped or broken.
+    """
+    report = {
+        "aliases": {},
+        "merged_concepts": {},
+        "dangling_prerequisites": [],
+        "cycles": [],
+        "removed_edges": [],
+    }
+    if not isinstance(raw_kg, dict):
+        report["valid"] = False
+        return {}, report
+
+    # 1. Canonicalize names, merging concepts whose names only differ cosmetically
+    graph = {}
+    key_to_name = {}
+    for raw_name, raw_data in raw_kg.items():
+        name = clean_name(raw_name)
+        if not name:
+            continue
+        data = raw_data if isinstance(raw_data, dict) else {}
+        key = canonical_key(name)
+        canonical_name = key_to_name.setdefault(key, name)
+        if canonical_name != name:
+            report["merged_concepts"].setdefault(canonical_name, []).append(name)
+
+        concept = graph.setdefault(canonical_name, {"prerequisites": [], "resources": []})
+        for field, value in data.items():
+            # Keep any extra fields the model produced (e.g. "description"), first occurrence wins
+            if field not in ("prerequisites", "resources"):
+                concept.setdefault(field, value)
+        prerequisites = data.get('prerequisites', [])
+        if isinstance(prerequisites, str):
+            prerequisites = [prerequisites]
+        concept["prerequisites"].extend(clean_name(p) for p in prerequisites or [] if isinstance(p, str) and p.strip())
+
+        seen_urls = {r['url'] for r in concept["resources"] if r['url'] != PLACEHOLDER_RESOURCE_URL}
+        for resource in data.get('resources', []) or []:
+            if not isinstance(resource, dict):
+                continue
+            resource = dict(resource)
+            if not resource.get('url'):
+                resource['url'] = PLACEHOLDER_RESOURCE_URL
+            if resource['url'] in seen_urls:
+                continue
+            if resource['url'] != PLACEHOLDER_RESOURCE_URL:
+                seen_urls.add(resource['url'])
+            concept["resources"].append(resource)
+
+    # 2. Alias map: every alias key of every concept, unless it is ambiguous
+    alias_map = {}
+    ambiguous = set()
+    for name in graph:
+        for key in alias_keys(name):
+            if key in alias_map and alias_map[key] != name:
+                ambiguous.add(key)
+            alias_map.setdefault(key, name)
+    for key in ambiguous:
+        del alias_map[key]
+    # Exact canonical keys always win over derived ones
+    for key, name in key_to_name.items():
+        alias_map[key] = name
+    report["aliases"] = {key: name for key, name in alias_map.items() if key != canonical_key(name)}
+
+    # 3. Resolve prerequisites through the alias map
+    for name, concept in graph.items():
+        resolved = []
+        self_loop = False
+        for prereq in concept["prerequisites"]:
+            target = prereq if prereq in graph else alias_map.get(canonical_key(prereq))
+            if target is None:
+                report["dangling_prerequisites"].append([name, prereq])
+            elif target == name:
+                self_loop = True
+            elif target not in resolved:
+                resolved.append(target)
+        concept["prerequisites"] = resolved
+        if self_loop:
+            # A concept requiring itself is the smallest cycle; its edge is dropped and reported
+            report["cycles"].append([name])
+            report["removed_edges"].append([name, name])
+
+    # 4. Break cycles: inside each strongly connected component keep only edges that point
+    # to concepts listed earlier in the graph, which leaves the component acyclic
+    position = {name: i for i, name in enumerate(graph)}
+    adjacency = {name: concept["prerequisites"] for name, concept in graph.items()}
+    for component in find_strongly_connected_components(adjacency):
+        if len(component) < 2:
+            continue
+        members = set(component)
+        report["cycles"].append(sorted(component, key=position.get))
+        for name in component:
+            kept = []
+            for prereq in graph[name]["prerequisites"]:
+                if prereq in members and position[prereq] > position[name]:
+                    report["removed_edges"].append([name, prereq])
+                else:
+                    kept.append(prereq)
+            graph[name]["prerequisites"] = kept
+
+    report["valid"] = not (report["dangling_prerequisites"] or report["cycles"])
+    return graph, report
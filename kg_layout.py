@@ -0,0 +1,116 @@
+from collections import defaultdict, deque
+
+# Spacing (in pixels) between layers and between neighbouring nodes of a layer
+LAYER_SPACING = 140
+NODE_SPACING = 220
+
+# Number of down/up barycenter sweeps used to reduce edge crossings
+ORDERING_SWEEPS = 4
+
+
+def assign_layers(knowledge_graph: dict) -> dict:
+    """
+    Assigns each concept the length of its longest prerequisite chain, so every
+    prerequisite sits on a higher layer than the concepts that depend on it.
+    Concepts left on a cycle (graphs that skipped ingest) go below everything else.
+    """
+    dependents = defaultdict(list)
+    remaining = {}
+    for concept, data in knowledge_graph.items():
+        prerequisites = [p for p in data.get('prerequisites', []) if p in knowledge_graph and p != concept]
+        remaining[concept] = len(prerequisites)
+        for prereq in prerequisites:
+            dependents[prereq].append(concept)
+
+    layer = {concept: 0 for concept in knowledge_graph}
+    queue = deque(concept for concept, count in remaining.items() if count == 0)
+    placed = set()
+    while queue:
+        concept = queue.popleft()
+        placed.add(concept)
+        for dependent in dependents[concept]:
+            layer[dependent] = max(layer[dependent], layer[concept] + 1)
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                queue.append(dependent)
+
+    if len(placed) < len(knowledge_graph):
+        bottom = max((layer[c] for c in placed), default=-1) + 1
+        for concept in knowledge_graph:
+            if concept not in placed:
+                layer[concept] = bottom
+    return layer
+
+
+def compute_layered_layout(knowledge_graph: dict) -> dict:
+    """
+    Computes a Sugiyama-style layered layout for a knowledge graph:
+    longest-path layering, dummy nodes for edges spanning several layers,
+    barycenter sweeps to reduce crossings, then evenly spaced coordinates.
+    Returns {"positions": {concept: {"x", "y"}}, "layers": [[concept]], "width", "height"},
+    suitable for a Cytoscape "preset" layout.
+    """
+    if not isinstance(knowledge_graph, dict) or not knowledge_graph:
+        return {"positions": {}, "layers": [], "width": 0, "height": 0}
+
+    layer_of = assign_layers(knowledge_graph)
+
+    # Split long edges into unit-length segments through dummy nodes
+    up_neighbors = defaultdict(list)    # node -> neighbors on the layer above
+    down_neighbors = defaultdict(list)  # node -> neighbors on the layer below
+    for concept, data in knowledge_graph.items():
+        for prereq in data.get('prerequisites', []):
+            if prereq not in knowledge_graph or layer_of[prereq] >= layer_of[concept]:
+                continue
+            previous = prereq
+            for dummy_layer in range(layer_of[prereq] + 1, layer_of[concept]):
+                dummy = ("dummy", prereq, concept, dummy_layer)
+                layer_of[dummy] = dummy_layer
+                down_neighbors[previous].append(dummy)
+                up_neighbors[dummy].append(previous)
+                previous = dummy
+            down_neighbors[previous].append(concept)
+            up_neighbors[concept].append(previous)
+
+    layers = [[] for _ in range(max(layer_of.values()) + 1)]
+    for node, index in layer_of.items():
+        layers[index].append(node)
+
+    # Barycenter ordering: alternately order each layer by the mean position of its neighbors
+    # on the layer above (downward sweep) or below (upward sweep)
+    position = {}
+    for nodes in layers:
+        for i, node in enumerate(nodes):
+            position[node] = i
+
+    def reorder(nodes, neighbors_of):
+        def barycenter(node):
+            neighbors = neighbors_of.get(node)
+            if not neighbors:
+                return position[node]
+            return sum(position[n] for n in neighbors) / len(neighbors)
+        nodes.sort(key=barycenter)
+        for i, node in enumerate(nodes):
+            position[node] = i
+
+    for _ in range(ORDERING_SWEEPS):
+        for nodes in layers[1:]:
+            reorder(nodes, up_neighbors)
+        for nodes in reversed(layers[:-1]):
+            reorder(nodes, down_neighbors)
+
+    # Coordinates: layers are centered horizontally on the widest one
+    widest = max(len(nodes) for nodes in layers)
+    positions = {}
+    for index, nodes in enumerate(layers):
+        offset = (widest - len(nodes)) * NODE_SPACING / 2
+        for i, node in enumerate(nodes):
+            if node in knowledge_graph:
+                positions[node] = {"x": round(offset + i * NODE_SPACING), "y": index * LAYER_SPACING}
+
+    return {
+        "positions": positions,
+        "layers": [[node for node in nodes if node in knowledge_graph] for nodes in layers],
+        "width": (widest - 1) * NODE_SPACING,
+        "height": (len(layers) - 1) * LAYER_SPACING,
+    }
@@ -0,0 +1,116 @@
+from collections import deque
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_NEIGHBORHOOD_HOPS = 3
+
+
+def clamp_page(offset, limit) -> tuple:
+    """
+    Parses offset/limit query values into a safe (offset, limit) pair.
+    """
+    try:
+        offset = max(0, int(offset))
+    except (TypeError, ValueError):
+        offset = 0
+    try:
+        limit = min(MAX_PAGE_SIZE, max(1, int(limit)))
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    return offset, limit
+
+
+def page_info(offset: int, limit: int, total: int) -> dict:
+    """
+    Pagination metadata returned alongside every page.
+    """
+    next_offset = offset + limit
+    return {"offset": offset, "limit": limit, "total": total, "next_offset": next_offset if next_offset < total else None}
+
+
+class GraphView:
+    """
+    Read-only paged view over a knowledge graph. Concepts get compact integer IDs
+    (their position in the graph) and the reverse adjacency is built once, so
+    summaries, neighborhoods and resource lists can be served page by page
+    without ever serializing the whole graph.
+    """
+
+    def __init__(self, knowledge_graph: dict):
+        self.knowledge_graph = knowledge_graph
+        self.names = list(knowledge_graph)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.prerequisites = [
+            [self.ids[p] for p in knowledge_graph[name].get('prerequisites', []) if p in self.ids]
+            for name in self.names
+        ]
+        self.dependents = [[] for _ in self.names]
+        for concept_id, prereq_ids in enumerate(self.prerequisites):
+            for prereq_id in prereq_ids:
+                self.dependents[prereq_id].append(concept_id)
+
+    def resolve(self, concept_id=None, name=None) -> int:
+        """
+        Looks a concept up by ID or by name and returns its ID, or None if unknown.
+        """
+        if concept_id is not None:
+            try:
+                concept_id = int(concept_id)
+            except (TypeError, ValueError):
+                return None
+            return concept_id if 0 <= concept_id < len(self.names) else None
+        return self.ids.get(name)
+
+    def _page(self, concept_ids: list, offset: int, limit: int) -> dict:
+        page_ids = concept_ids[offset:offset + limit]
+        return {
+            "concepts": [{"id": i, "name": self.names[i]} for i in page_ids],
+            # Edges are [prerequisite_id, concept_id]; every concept's incoming edges travel with it
+            "edges": [[p, i] for i in page_ids for p in self.prerequisites[i]],
+            "page": page_info(offset, limit, len(concept_ids)),
+        }
+
+    def summary(self, offset: int, limit: int) -> dict:
+        """
+        Returns a page of concept IDs, names and prerequisite edges, without resources.
+        """
+        return self._page(list(range(len(self.names))), offset, limit)
+
+    def neighborhood(self, concept_id: int, hops: int, offset: int, limit: int) -> dict:
+        """
+        Returns a page of the concepts within `hops` prerequisite/dependent steps of
+        a concept, nearest first, with their edges and hop distances.
+        """
+        hops = min(MAX_NEIGHBORHOOD_HOPS, max(0, hops))
+        distance = {concept_id: 0}
+        queue = deque([concept_id])
+        while queue:
+            current = queue.popleft()
+            if distance[current] == hops:
+                continue
+            for neighbor in self.prerequisites[current] + self.dependents[current]:
+                if neighbor not in distance:
+                    distance[neighbor] = distance[current] + 1
+                    queue.append(neighbor)
+
+        page = self._page(list(distance), offset, limit)
+        for concept in page["concepts"]:
+            concept["distance"] = distance[concept["id"]]
+        return page
+
+    def resources(self, concept_id: int, offset: int, limit: int) -> dict:
+        """
+        Returns a page of the resources of a single concept.
+        """
+        resources = self.knowledge_graph[self.names[concept_id]].get('resources', [])
+        return {
+            "concept": {"id": concept_id, "name": self.names[concept_id]},
+            "resources": resources[offset:offset + limit],
+            "page": page_info(offset, limit, len(resources)),
+        }
+
+    def without_resources(self) -> dict:
+        """
+        Returns the graph with prerequisites only, for clients that load resources on demand.
+        """
+        return {name: {"prerequisites": [self.names[p] for p in self.prerequisites[i]]} for i, name in enumerate(self.names)}
@@ -0,0 +1,124 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+# Rough characters-per-token ratio used to keep injected context under budget
+# without pulling in a tokenizer.
+CHARS_PER_TOKEN = 4
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common question words that would otherwise match concept names like "Introduction to ML"
+STOP_WORDS = {
+    "a", "an", "and", "are", "before", "can", "do", "does", "for", "how", "i", "in", "is", "it",
+    "me", "my", "of", "on", "or", "should", "the", "to", "what", "when", "which", "why", "with",
+}
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercases the text and splits it into alphanumeric tokens, dropping stop words.
+    """
+    return [token for token in TOKEN_PATTERN.findall(str(text).lower()) if token not in STOP_WORDS]
+
+
+class KnowledgeGraphIndex:
+    """
+    BM25 index over the concepts of a knowledge graph.
+    Each concept is indexed as a document made of its name, its prerequisites
+    and the titles of its resources, so chat questions can be grounded in the
+    handful of concepts they are actually about.
+    """
+
+    def __init__(self, knowledge_graph: dict, k1: float = 1.5, b: float = 0.75):
+        self.knowledge_graph = knowledge_graph if isinstance(knowledge_graph, dict) else {}
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(concept, term frequency)]
+        self.doc_lengths = {}
+        self.dependents = defaultdict(list)  # concept -> concepts that require it
+
+        for concept, data in self.knowledge_graph.items():
+            data = data if isinstance(data, dict) else {}
+            prerequisites = data.get('prerequisites', []) or []
+            # The concept name is repeated so that name matches outrank resource title matches
+            terms = tokenize(concept) * 2
+            for prereq in prerequisites:
+                terms.extend(tokenize(prereq))
+                self.dependents[prereq].append(concept)
+            for resource in data.get('resources', []) or []:
+                if isinstance(resource, dict):
+                    terms.extend(tokenize(resource.get('title', '')))
+
+            self.doc_lengths[concept] = len(terms)
+            for term, frequency in Counter(terms).items():
+                self.postings[term].append((concept, frequency))
+
+        self.avg_doc_length = (sum(self.doc_lengths.values()) / len(self.doc_lengths)) if self.doc_lengths else 0.0
+
+    def search(self, query: str, top_k: int = 3) -> list:
+        """
+        Returns up to top_k (concept, score) pairs ranked by BM25 score.
+        """
+        total_docs = len(self.doc_lengths)
+        if not total_docs:
+            return []
+
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for concept, frequency in postings:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[concept] / (self.avg_doc_length or 1)
+                scores[concept] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+    def neighbors(self, concept: str) -> list:
+        """
+        Returns the direct prerequisites and dependents of a concept.
+        """
+        data = self.knowledge_graph.get(concept, {})
+        prerequisites = data.get('prerequisites', []) if isinstance(data, dict) else []
+        return [c for c in list(prerequisites or []) + self.dependents.get(concept, []) if c in self.knowledge_graph]
+
+    def describe_concept(self, concept: str) -> str:
+        """
+        Renders one concept as a single prompt line.
+        """
+        data = self.knowledge_graph.get(concept, {})
+        data = data if isinstance(data, dict) else {}
+        line = f"- {concept}: Prerequisites: [{', '.join(data.get('prerequisites', []) or [])}]"
+        titles = [r.get('title', '') for r in data.get('resources', []) or [] if isinstance(r, dict) and r.get('title')]
+        if titles:
+            line += f"; Resources: {', '.join(titles)}"
+        return line
+
+    def build_context(self, query: str, top_k: int = 3, token_budget: int = 600) -> str:
+        """
+        Selects the top_k concepts relevant to the query plus their neighbors and
+        renders them as prompt lines, stopping once the token budget is reached.
+        Returns an empty string when nothing in the graph matches.
+        """
+        selected = []
+        seen = set()
+        hits = [concept for concept, _ in self.search(query, top_k)]
+        # Matched concepts first, then their neighbors, so the budget cuts the least relevant lines
+        for concept in hits + [n for hit in hits for n in self.neighbors(hit)]:
+            if concept not in seen:
+                seen.add(concept)
+                selected.append(concept)
+
+        lines = []
+        used_chars = 0
+        budget_chars = token_budget * CHARS_PER_TOKEN
+        for concept in selected:
+            line = self.describe_concept(concept)
+            if used_chars + len(line) > budget_chars:
+                break
+            lines.append(line)
+            used_chars += len(line) + 1
+        return "\n".join(lines)
@@ -0,0 +1,328 @@
+"""
+Compact binary snapshots of knowledge graphs.
+
+Layout (little-endian, every section 4-byte aligned):
+    header          magic, version, section counts, CRC32 of everything after the header
+    string offsets  u32[n_strings + 1] into the UTF-8 string blob
+    string blob     every distinct string (names, titles, URLs, ...) stored once
+    concepts        u32[n_concepts * 2]: name string ID, extra-fields string ID
+    prerequisites   CSR adjacency: u32[n_concepts + 1] offsets, u32[n_edges] concept indices
+    resources       u32[n_resources * 4]: type, title, url, extra-fields string IDs (deduplicated)
+                    (fields that are not strings, e.g. "url": null, are kept as JSON in the extra fields)
+    concept links   CSR: u32[n_concepts + 1] offsets, u32[n_resource_refs] resource indices
+
+Snapshots are read through mmap and decoded lazily, so looking up one concept
+does not parse the whole graph. Offsets and IDs are validated when a snapshot is
+opened, so a corrupt snapshot raises SnapshotError instead of failing on access.
+
+Usage:
+    python kg_snapshot.py export graph.json graph.kgs
+    python kg_snapshot.py import graph.kgs graph.json
+    python kg_snapshot.py verify graph.json
+"""
+import json
+import mmap
+import operator
+import struct
+import sys
+import zlib
+from array import array
+
+MAGIC = b"KGSNAP\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIIII")  # magic, version, strings, concepts, edges, resources, resource refs, crc32
+NO_STRING = 0xFFFFFFFF  # string ID meaning "absent"
+RESOURCE_FIELDS = ("type", "title", "url")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot is truncated, corrupt or of an unsupported version."""
+
+
+def _u32_array(values) -> bytes:
+    data = array('I', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes()
+
+
+def _pad(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def dumps_snapshot(knowledge_graph: dict) -> bytes:
+    """
+    Serializes a knowledge graph ({concept: {"prerequisites", "resources", ...}}) to snapshot bytes.
+    Prerequisites that do not name a concept of the graph are dropped.
+    """
+    strings = []
+    string_ids = {}
+
+    def intern(value) -> int:
+        if value is None:
+            return NO_STRING
+        value = str(value)
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    def extras_of(data: dict, known_fields) -> int:
+        extras = {k: v for k, v in data.items() if k not in known_fields}
+        return intern(json.dumps(extras, sort_keys=True)) if extras else NO_STRING
+
+    def string_field(resource: dict, field: str) -> int:
+        # Only string values are stored as strings; None and others travel in the extras
+        value = resource.get(field)
+        return intern(value) if isinstance(value, str) else NO_STRING
+
+    names = list(knowledge_graph)
+    concept_index = {name: i for i, name in enumerate(names)}
+    concepts, prereq_offsets, prereq_targets = [], [0], []
+    resource_rows, resource_ids = [], {}
+    link_offsets, link_targets = [0], []
+
+    for name in names:
+        data = knowledge_graph[name] if isinstance(knowledge_graph[name], dict) else {}
+        concepts.extend((intern(name), extras_of(data, ("prerequisites", "resources"))))
+
+        prereq_targets.extend(concept_index[p] for p in data.get('prerequisites') or [] if p in concept_index)
+        prereq_offsets.append(len(prereq_targets))
+
+        for resource in data.get('resources') or []:
+            string_fields = [field for field in RESOURCE_FIELDS if isinstance(resource.get(field), str)]
+            row = tuple(string_field(resource, field) for field in RESOURCE_FIELDS) + (extras_of(resource, string_fields),)
+            if row not in resource_ids:
+                resource_ids[row] = len(resource_ids)
+                resource_rows.extend(row)
+            link_targets.append(resource_ids[row])
+        link_offsets.append(len(link_targets))
+
+    encoded = [s.encode('utf-8') for s in strings]
+    string_offsets = [0]
+    for blob in encoded:
+        string_offsets.append(string_offsets[-1] + len(blob))
+
+    body = b"".join([
+        _u32_array(string_offsets),
+        _pad(b"".join(encoded)),
+        _u32_array(concepts),
+        _u32_array(prereq_offsets),
+        _u32_array(prereq_targets),
+        _u32_array(resource_rows),
+        _u32_array(link_offsets),
+        _u32_array(link_targets),
+    ])
+    header = HEADER.pack(MAGIC, VERSION, len(strings), len(names), len(prereq_targets),
+                         len(resource_ids), len(link_targets), zlib.crc32(body))
+    return header + body
+
+
+def write_snapshot(knowledge_graph: dict, path: str):
+    """
+    Writes a knowledge graph snapshot to path.
+    """
+    with open(path, 'wb') as f:
+        f.write(dumps_snapshot(knowledge_graph))
+
+
+def _check_offsets(offsets, end: int, what: str):
+    # CSR offsets start at 0, never decrease and end at the section's length
+    if offsets[0] != 0 or offsets[-1] != end or not all(map(operator.le, offsets[:-1], offsets[1:])):
+        raise SnapshotError(f"Snapshot has corrupt {what} offsets.")
+
+
+def _check_ids(ids, count: int, what: str, absent_allowed: bool = False):
+    if absent_allowed:
+        ids = [i for i in ids if i != NO_STRING]
+    if len(ids) and max(ids) >= count:
+        raise SnapshotError(f"Snapshot has an out-of-range {what} ID.")
+
+
+class KnowledgeGraphSnapshot:
+    """
+    Lazy reader over snapshot bytes (or an mmap of a snapshot file). Sections are
+    exposed as zero-copy u32 views; strings and concepts are decoded on access.
+    """
+
+    def __init__(self, buffer, verify: bool = True):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise SnapshotError("Snapshot is truncated.")
+        magic, version, n_strings, n_concepts, n_edges, n_resources, n_refs, crc = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise SnapshotError("Not a knowledge graph snapshot.")
+        if version != VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {version}.")
+        if verify and zlib.crc32(view[HEADER.size:]) != crc:
+            raise SnapshotError("Snapshot checksum mismatch.")
+
+        position = HEADER.size
+
+        def take_u32(count):
+            nonlocal position
+            end = position + count * 4
+            if end > len(view):
+                raise SnapshotError("Snapshot is truncated.")
+            section = view[position:end]
+            position = end
+            if sys.byteorder != 'little':
+                swapped = array('I', section.tobytes())
+                swapped.byteswap()
+                return swapped
+            return section.cast('I')
+
+        self._string_offsets = take_u32(n_strings + 1)
+        blob_length = self._string_offsets[n_strings] if n_strings else 0
+        if position + blob_length > len(view):
+            raise SnapshotError("Snapshot is truncated.")
+        self._string_blob = view[position:position + blob_length]
+        position += blob_length + (-blob_length % 4)
+        self._concepts = take_u32(n_concepts * 2)
+        self._prereq_offsets = take_u32(n_concepts + 1)
+        self._prereq_targets = take_u32(n_edges)
+        self._resources = take_u32(n_resources * 4)
+        self._link_offsets = take_u32(n_concepts + 1)
+        self._link_targets = take_u32(n_refs)
+
+        _check_offsets(self._string_offsets, blob_length, "string")
+        _check_ids(self._concepts[0::2], n_strings, "concept name")
+        _check_ids(self._concepts[1::2], n_strings, "concept field", absent_allowed=True)
+        _check_offsets(self._prereq_offsets, n_edges, "prerequisite")
+        _check_ids(self._prereq_targets, n_concepts, "prerequisite")
+        _check_ids(self._resources, n_strings, "resource field", absent_allowed=True)
+        _check_offsets(self._link_offsets, n_refs, "resource link")
+        _check_ids(self._link_targets, n_resources, "resource link")
+
+        self._strings = {}
+        self._index = None
+
+    @classmethod
+    def open(cls, path: str, verify: bool = True) -> "KnowledgeGraphSnapshot":
+        """
+        Memory-maps a snapshot file and returns a lazy reader over it.
+        """
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, verify=verify)
+
+    def string(self, string_id: int):
+        if string_id == NO_STRING:
+            return None
+        value = self._strings.get(string_id)
+        if value is None:
+            start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+            try:
+                value = str(self._string_blob[start:end], 'utf-8')
+            except UnicodeDecodeError:
+                raise SnapshotError(f"String {string_id} is not valid UTF-8.")
+            self._strings[string_id] = value
+        return value
+
+    def _extras(self, string_id: int) -> dict:
+        try:
+            extras = json.loads(self.string(string_id))
+        except json.JSONDecodeError:
+            extras = None
+        if not isinstance(extras, dict):
+            raise SnapshotError(f"String {string_id} does not hold extra fields.")
+        return extras
+
+    def __len__(self) -> int:
+        return len(self._concepts) // 2
+
+    def __iter__(self):
+        return (self.name(i) for i in range(len(self)))
+
+    def __contains__(self, name) -> bool:
+        return self.index_of(name) is not None
+
+    def name(self, concept_index: int) -> str:
+        return self.string(self._concepts[concept_index * 2])
+
+    def index_of(self, name: str):
+        """
+        Returns the position of a concept, or None. The name index is built on first use.
+        """
+        if self._index is None:
+            self._index = {self.name(i): i for i in range(len(self))}
+        return self._index.get(name)
+
+    def prerequisites(self, concept_index: int) -> list:
+        start, end = self._prereq_offsets[concept_index], self._prereq_offsets[concept_index + 1]
+        return [self.name(self._prereq_targets[i]) for i in range(start, end)]
+
+    def resource(self, resource_index: int) -> dict:
+        row = self._resources[resource_index * 4:resource_index * 4 + 4]
+        resource = {field: self.string(sid) for field, sid in zip(RESOURCE_FIELDS, row[:3]) if sid != NO_STRING}
+        if row[3] != NO_STRING:
+            resource.update(self._extras(row[3]))
+        return resource
+
+    def resources(self, concept_index: int) -> list:
+        start, end = self._link_offsets[concept_index], self._link_offsets[concept_index + 1]
+        return [self.resource(self._link_targets[i]) for i in range(start, end)]
+
+    def concept(self, name: str) -> dict:
+        """
+        Decodes one concept into its dict form, or returns None if it is not in the snapshot.
+        """
+        concept_index = self.index_of(name)
+        if concept_index is None:
+            return None
+        data = {"prerequisites": self.prerequisites(concept_index), "resources": self.resources(concept_index)}
+        extras_id = self._concepts[concept_index * 2 + 1]
+        if extras_id != NO_STRING:
+            data.update(self._extras(extras_id))
+        return data
+
+    def to_dict(self) -> dict:
+        """
+        Decodes the whole snapshot into the usual knowledge graph dict.
+        """
+        return {name: self.concept(name) for name in self}
+
+
+def loads_snapshot(data: bytes) -> dict:
+    """
+    Decodes snapshot bytes into a knowledge graph dict.
+    """
+    return KnowledgeGraphSnapshot(data).to_dict()
+
+
+def read_snapshot(path: str) -> dict:
+    """
+    Reads a snapshot file into a knowledge graph dict.
+    """
+    return KnowledgeGraphSnapshot.open(path).to_dict()
+
+
+def main(argv) -> int:
+    if len(argv) == 3 and argv[0] == "export":
+        with open(argv[1], encoding='utf-8') as f:
+            knowledge_graph = json.load(f)
+        write_snapshot(knowledge_graph, argv[2])
+        print(f"Wrote {len(knowledge_graph)} concepts to {argv[2]}")
+        return 0
+    if len(argv) == 3 and argv[0] == "import":
+        knowledge_graph = read_snapshot(argv[1])
+        with open(argv[2], 'w', encoding='utf-8') as f:
+            json.dump(knowledge_graph, f, indent=2, ensure_ascii=False)
+        print(f"Wrote {len(knowledge_graph)} concepts to {argv[2]}")
+        return 0
+    if len(argv) == 2 and argv[0] == "verify":
+        with open(argv[1], encoding='utf-8') as f:
+            knowledge_graph = json.load(f)
+        round_tripped = loads_snapshot(dumps_snapshot(knowledge_graph))
+        if round_tripped != knowledge_graph:
+            print("Round trip mismatch: the snapshot does not reproduce the graph.")
+            return 1
+        print(f"Round trip OK for {len(knowledge_graph)} concepts")
+        return 0
+    print(__doc__)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,120 @@
+import threading
+from collections import OrderedDict
+
+# Graphs whose derived structure is kept for new frontiers; frontiers hold on to theirs
+MAX_GRAPH_STRUCTURES = 64
+
+
+class GraphStructure:
+    """
+    What every frontier on one knowledge graph shares: each concept's position, its
+    prerequisites within the graph and the concepts that depend on it. Built once per
+    graph (see graph_structure()) and never modified.
+    """
+
+    __slots__ = ("knowledge_graph", "position", "prerequisites", "dependents")
+
+    def __init__(self, knowledge_graph: dict):
+        self.knowledge_graph = knowledge_graph
+        self.position = {name: i for i, name in enumerate(knowledge_graph)}
+        self.prerequisites = {}
+        self.dependents = {name: [] for name in knowledge_graph}
+        for name, data in knowledge_graph.items():
+            prerequisites = tuple({p for p in data.get('prerequisites', []) if p in self.position and p != name})
+            self.prerequisites[name] = prerequisites
+            for prereq in prerequisites:
+                self.dependents[prereq].append(name)
+
+
+graph_structures = OrderedDict()  # id(knowledge_graph) -> GraphStructure, least recently used first
+graph_structures_lock = threading.Lock()
+
+
+def graph_structure(knowledge_graph: dict) -> GraphStructure:
+    """
+    Returns the shared structure of a knowledge graph, building it on first use.
+    Graphs are matched by identity, so a graph must not be modified once frontiers use it.
+    """
+    key = id(knowledge_graph)
+    with graph_structures_lock:
+        structure = graph_structures.get(key)
+        # The structure keeps its graph alive, so a matching id cannot belong to a different graph
+        if structure is not None and structure.knowledge_graph is knowledge_graph:
+            graph_structures.move_to_end(key)
+            return structure
+    structure = GraphStructure(knowledge_graph)
+    with graph_structures_lock:
+        graph_structures[key] = structure
+        graph_structures.move_to_end(key)
+        while len(graph_structures) > MAX_GRAPH_STRUCTURES:
+            graph_structures.popitem(last=False)
+    return structure
+
+
+class LearningFrontier:
+    """
+    The "ready to learn next" set of one learner on one knowledge graph: the concepts
+    that are not known yet but whose prerequisites all are. Each concept keeps a count
+    of its unmet prerequisites, so marking a concept known or unknown only touches the
+    concepts that depend on it (O(out-degree)) instead of re-walking the graph.
+    Prerequisites that are not concepts of the graph never block anything.
+    The graph-derived structure is shared by all frontiers on the same graph; only
+    the known set, the counts and the ready set are per learner.
+    """
+
+    def __init__(self, knowledge_graph: dict, known_concepts=()):
+        self.structure = graph_structure(knowledge_graph)
+        self.knowledge_graph = knowledge_graph
+        self.lock = threading.Lock()
+        self.known = {c for c in known_concepts if c in self.structure.position}
+        self.unmet = {
+            name: sum(1 for p in prerequisites if p not in self.known)
+            for name, prerequisites in self.structure.prerequisites.items()
+        }
+        self.ready = {name for name, count in self.unmet.items() if count == 0 and name not in self.known}
+
+    def mark_known(self, concept: str) -> bool:
+        """
+        Marks a concept known. Returns False if it is not in the graph or was already known.
+        """
+        with self.lock:
+            if concept not in self.structure.position or concept in self.known:
+                return False
+            self.known.add(concept)
+            self.ready.discard(concept)
+            for dependent in self.structure.dependents[concept]:
+                self.unmet[dependent] -= 1
+                if self.unmet[dependent] == 0 and dependent not in self.known:
+                    self.ready.add(dependent)
+            return True
+
+    def mark_unknown(self, concept: str) -> bool:
+        """
+        Marks a concept not known (e.g. cleared, or moved to struggling). Returns False
+        if it is not in the graph or was not known.
+        """
+        with self.lock:
+            if concept not in self.known:
+                return False
+            self.known.discard(concept)
+            if self.unmet[concept] == 0:
+                self.ready.add(concept)
+            for dependent in self.structure.dependents[concept]:
+                if self.unmet[dependent] == 0:
+                    self.ready.discard(dependent)
+                self.unmet[dependent] += 1
+            return True
+
+    def ready_concepts(self) -> list:
+        """
+        Returns the concepts that are ready to learn next, in knowledge graph order.
+        """
+        with self.lock:
+            return sorted(self.ready, key=self.structure.position.__getitem__)
+
+    def unmet_prerequisites(self, concept: str):
+        """
+        Returns how many of a concept's prerequisites are not known yet, or None if it is not in the graph.
+        """
+        with self.lock:
+            return self.unmet.get(concept)
@@ -1,15 +1,86 @@
 import json
+import os
 import requests
 import re
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, render_template_string
 from flask_cors import CORS # Required for cross-origin requests from frontend
+from concept_store import ConceptStore
+from concept_trie import MAX_SUGGESTIONS, ConceptTrie
+from jobs import FINISHED_STATES, JOB_FAILED, JOB_SUCCEEDED, JobManager
+from kg_ingest import normalize_knowledge_graph
+from kg_layout import compute_layered_layout
+from kg_paging import GraphView, clamp_page
+from kg_retrieval import KnowledgeGraphIndex
+from learning_frontier import LearningFrontier
+from micro_batcher import MicroBatcher
+from path_planning import describe_goals, parse_goals, repair_learning_path
+from kg_snapshot import KnowledgeGraphSnapshot, SnapshotError, dumps_snapshot
+from resource_registry import ResourceRegistry
+from progress_store import ProgressStore, STATE_KNOWN, VALID_STATES
+from serving import gemini_session, run_cpu_bound
+from speculation import Speculator
+from topic_resolver import TopicResolver, normalize_topic
+from tracing import install_tracing, span
 
 app = Flask(__name__)
 CORS(app) # Enable CORS for frontend requests
+install_tracing(app) # Opt-in per-request tracing (X-Trace header or TRACE_SAMPLE_RATE), see /debug/traces
 
 # Cache for storing knowledge graphs by topic
 knowledge_graph_cache = {}
 
+# Validation reports produced when each cached knowledge graph was ingested, keyed by topic
+knowledge_graph_reports = {}
+
+# Precomputed node coordinates for each cached knowledge graph, keyed by topic
+knowledge_graph_layouts = {}
+
+# Maps requested topics (e.g. "ML", "machine-learning") onto topics that already have a cached graph
+topic_resolver = TopicResolver()
+
+# Bounded worker pool for knowledge graph generation jobs, deduplicated by topic
+generation_jobs = JobManager(max_workers=4)
+
+# How long a request waits on a job before re-checking it (also the SSE keep-alive interval)
+JOB_WAIT_SECONDS = 15
+
+# Learner progress (known/struggling concepts) per learner and topic, written behind to SQLite
+progress_store = ProgressStore(os.environ.get("PROGRESS_DB_PATH", "learner_progress.db"))
+
+# "Ready to learn next" sets per (learner_id, topic), updated in place as progress changes
+learning_frontiers = {}
+MAX_LEARNING_FRONTIERS = 10000
+
+# Paged read-only views (concept IDs, reverse adjacency) over each cached knowledge graph, keyed by topic
+knowledge_graph_views = {}
+
+# Concept name tries for goal autocomplete, keyed by topic (None for the default graph)
+concept_tries = {}
+
+# Concurrent path requests against the same graph are sent to Gemini as one multi-learner prompt,
+# collected for up to this long (0 disables batching) or until the batch is full
+PATH_BATCH_WINDOW_SECONDS = float(os.environ.get("PATH_BATCH_WINDOW_SECONDS", "0"))
+PATH_BATCH_MAX_SIZE = int(os.environ.get("PATH_BATCH_MAX_SIZE", "8"))
+
+# Generated paths keyed by (topic, goal, known concepts, struggling concepts), filled by requests and by speculation
+path_cache = {}
+PATH_CACHE_SIZE = 5000
+
+# Last goal and path per (learner_id, topic), used to predict the learner's next path request
+learner_path_state = {}
+
+# Precomputes the paths learners will likely ask for next on a dedicated, bounded pool;
+# SPECULATIVE_CALLS_PER_MINUTE caps the Gemini calls it may spend (0 disables speculation)
+SPECULATIVE_CALLS_PER_MINUTE = int(os.environ.get("SPECULATIVE_CALLS_PER_MINUTE", "30"))
+speculator = Speculator(max_workers=1, max_pending=8, calls_per_minute=SPECULATIVE_CALLS_PER_MINUTE)
+
+# Retrieval indexes used to ground chat answers, keyed by topic
+retrieval_index_cache = {}
+
+# How many concepts (plus their neighbors) are injected into a chat prompt, and the token budget for them
+CHAT_CONTEXT_TOP_K = 3
+CHAT_CONTEXT_TOKEN_BUDGET = 600
+
 # KNOWLEDGE_GRAPH will now be dynamically generated.
 # We keep a placeholder or a default structure for reference if needed,
 # but the primary source will be the LLM.
@@ -77,6 +148,16 @@ DEFAULT_KNOWLEDGE_GRAPH = {
 }
 
 
+# Every resource of every graph, interned by normalized URL and addressed by compact IDs
+resource_registry = ResourceRegistry()
+
+# Concepts shared across all topics; incremental generation only asks the model for concepts missing here
+concept_store = ConceptStore(resource_registry)
+concept_store.add_graph(DEFAULT_KNOWLEDGE_GRAPH)
+
+# Minimum number of related known concepts for a topic to be generated incrementally
+MIN_KNOWN_CONCEPTS_FOR_DELTA = 3
+
 
 def call_gemini_api(prompt_text: str, response_schema: dict) -> dict:
     """
@@ -102,21 +183,26 @@ def call_gemini_api(prompt_text: str, response_schema: dict) -> dict:
     api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
 
     try:
-        response = requests.post(api_url, headers={'Content-Type': 'application/json'}, json=payload)
-        response.raise_for_status()
-        result = response.json()
+        # Streaming defers the body read, so the first span ends at the response headers (TTFB)
+        with span("gemini.ttfb"):
+            response = gemini_session.post(api_url, json=payload, stream=True)
+        with span("gemini.body") as body_span:
+            response.raise_for_status()
+            result = response.json()
+            body_span.set(bytes=len(response.content))
 
         if result.get('candidates') and result['candidates'][0].get('content') and result['candidates'][0]['content'].get('parts'):
             raw_llm_response = result['candidates'][0]['content']['parts'][0]['text']
             print(f"Raw LLM Response: {raw_llm_response}")
 
-            match = re.search(r'```json\n(.*)\n```', raw_llm_response, re.DOTALL)
-            if match:
-                json_string = match.group(1)
-            else:
-                json_string = raw_llm_response
+            with span("parse_output"):
+                match = re.search(r'```json\n(.*)\n```', raw_llm_response, re.DOTALL)
+                if match:
+                    json_string = match.group(1)
+                else:
+                    json_string = raw_llm_response
 
-            parsed_result = json.loads(json_string)
+                parsed_result = json.loads(json_string)
             return parsed_result
         else:
             print(f"Unexpected API response structure: {result}")
@@ -131,30 +217,122 @@ def call_gemini_api(prompt_text: str, response_schema: dict) -> dict:
         print(f"An unexpected error occurred during API call: {e}")
         return {}
 
+def cache_knowledge_graph(topic: str, knowledge_graph: dict, validation_report: dict) -> dict:
+    """
+    Stores an ingested knowledge graph with its validation report and computes its layout once.
+    Returns the response payload for the graph.
+    """
+    # Register concepts with the concept store, which also interns the graph's resource dicts
+    concept_store.add_graph(knowledge_graph)
+    # Build everything derived from the graph before publishing it: the layout yields to other
+    # requests, which must not see the new graph with a missing or stale layout, view or trie
+    layout = run_cpu_bound(compute_layered_layout, knowledge_graph)
+    graph_view = GraphView(knowledge_graph)
+    concept_trie = ConceptTrie(knowledge_graph)
+
+    knowledge_graph_layouts[topic] = layout
+    knowledge_graph_views[topic] = graph_view
+    concept_tries[topic] = concept_trie
+    knowledge_graph_reports[topic] = validation_report
+    knowledge_graph_cache[topic] = knowledge_graph
+    topic_resolver.add_topic(topic)
+    return cached_knowledge_graph_payload(topic)
+
+# include_resources value asking for resources as a table referenced by ID, instead of inline per concept
+RESOURCES_AS_TABLE = "table"
+
+def parse_include_resources(value):
+    """
+    Reads the include_resources option from a JSON body or query string: True (default),
+    False, or RESOURCES_AS_TABLE.
+    """
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value == RESOURCES_AS_TABLE:
+            return RESOURCES_AS_TABLE
+        return value != 'false'
+    return value is not False
+
+def cached_knowledge_graph_payload(topic: str, include_resources=True) -> dict:
+    """
+    Builds the response payload for a cached topic: the graph, its validation report and its layout.
+    Without resources, the graph only carries prerequisites and resources are fetched per concept.
+    With RESOURCES_AS_TABLE, concepts list resource_ids and each resource is sent once under "resources".
+    """
+    payload = {"canonical_topic": topic}
+    if include_resources == RESOURCES_AS_TABLE:
+        payload["knowledge_graph"], payload["resources"] = resource_registry.compact(knowledge_graph_cache[topic])
+    elif include_resources:
+        payload["knowledge_graph"] = knowledge_graph_cache[topic]
+    else:
+        payload["knowledge_graph"] = get_graph_view(topic).without_resources()
+    payload["validation_report"] = knowledge_graph_reports.get(topic)
+    payload["layout"] = knowledge_graph_layouts.get(topic)
+    return payload
+
+def resolve_topic(requested_topic: str) -> str:
+    """
+    Returns the cache key for a requested topic: the cached topic it resolves to, if any,
+    else its normalized form.
+    """
+    if not requested_topic or not requested_topic.strip():
+        return ''
+    return topic_resolver.resolve(requested_topic)[0]
+
+def get_graph_view(topic: str) -> GraphView:
+    """
+    Returns the paged view of a cached topic, or None if the topic is not cached.
+    """
+    if topic not in knowledge_graph_cache:
+        return None
+    view = knowledge_graph_views.get(topic)
+    if view is None or view.knowledge_graph is not knowledge_graph_cache[topic]:
+        view = GraphView(knowledge_graph_cache[topic])
+        knowledge_graph_views[topic] = view
+    return view
+
 @app.route('/')
 def index():
     """Serves the main HTML page."""
     return app.send_static_file('index.html')
 
-@app.route('/generate_knowledge_graph', methods=['POST'])
-def generate_knowledge_graph_endpoint():
+class KnowledgeGraphGenerationError(Exception):
+    """Raised when the AI model does not produce a usable knowledge graph."""
+
+def coerce_generated_graph(generated_kg) -> dict:
     """
-    API endpoint to dynamically generate a knowledge graph based on a topic.
-    Caches the knowledge graph for subsequent requests.
+    Converts the model's knowledge graph output into the {concept: data} dict format.
+    Returns None if the output has an unexpected top-level structure.
     """
-    data = request.get_json()
-    topic = data.get('topic', '').strip().lower()
-
-    if not topic:
-        return jsonify({"error": "Topic is required to generate knowledge graph."}), 400
-
-    # Check if the knowledge graph for the topic is already cached
-    if topic in knowledge_graph_cache:
-        print(f"Returning cached knowledge graph for topic: '{topic}'")
-        return jsonify({"knowledge_graph": knowledge_graph_cache[topic]})
+    print(f"Type of generated_kg from LLM: {type(generated_kg)}")
+    final_kg_structure = {}
 
-    print(f"Generating knowledge graph for topic: '{topic}'")
+    if isinstance(generated_kg, dict):
+        # If LLM returns a dict, use it directly
+        final_kg_structure = generated_kg
+    elif isinstance(generated_kg, list):
+        # If LLM returns a list, try to convert it to the expected dict format
+        # This handles cases like [{"concept_name": "X", ...}, {"concept_name": "Y", ...}]
+        for item in generated_kg:
+            if isinstance(item, dict) and "concept_name" in item: # Assuming 'concept_name' might be the key if it's a list of objects
+                concept_name = item.pop("concept_name") # Remove and use as key
+                final_kg_structure[concept_name] = item
+            elif isinstance(item, dict) and len(item) == 1 and list(item.keys())[0] not in ["prerequisites", "resources"]:
+                # Handle cases where LLM might return a list of single-key dicts like [{"Concept A": {...}}, {"Concept B": {...}}]
+                concept_name = list(item.keys())[0]
+                final_kg_structure[concept_name] = item[concept_name]
+            else:
+                print(f"Warning: Skipping unexpected item structure in generated KG list: {item}")
+    else:
+        print("Error: Generated knowledge graph has an unexpected top-level structure (not dict or list).")
+        return None
+    return final_kg_structure
 
+def generate_full_knowledge_graph(topic: str) -> dict:
+    """
+    Asks Gemini for a complete knowledge graph for the topic.
+    Raises KnowledgeGraphGenerationError on failure.
+    """
     kg_prompt = f"""
         You are an AI assistant specialized in generating structured knowledge graphs for educational purposes.
         Given a topic, generate a knowledge graph as a JSON object.
@@ -208,65 +386,653 @@ def generate_knowledge_graph_endpoint():
 
     generated_kg = call_gemini_api(kg_prompt, kg_schema)
 
-    if generated_kg:
-        print(f"Type of generated_kg from LLM: {type(generated_kg)}")
-        final_kg_structure = {}
-
-        if isinstance(generated_kg, dict):
-            # If LLM returns a dict, use it directly
-            final_kg_structure = generated_kg
-        elif isinstance(generated_kg, list):
-            # If LLM returns a list, try to convert it to the expected dict format
-            # This handles cases like [{"concept_name": "X", ...}, {"concept_name": "Y", ...}]
-            for item in generated_kg:
-                if isinstance(item, dict) and "concept_name" in item: # Assuming 'concept_name' might be the key if it's a list of objects
-                    concept_name = item.pop("concept_name") # Remove and use as key
-                    final_kg_structure[concept_name] = item
-                elif isinstance(item, dict) and len(item) == 1 and list(item.keys())[0] not in ["prerequisites", "resources"]:
-                    # Handle cases where LLM might return a list of single-key dicts like [{"Concept A": {...}}, {"Concept B": {...}}]
-                    concept_name = list(item.keys())[0]
-                    final_kg_structure[concept_name] = item[concept_name]
-                else:
-                    print(f"Warning: Skipping unexpected item structure in generated KG list: {item}")
-        else:
-            print("Error: Generated knowledge graph has an unexpected top-level structure (not dict or list).")
-            return jsonify({"error": "Generated knowledge graph has an unexpected top-level structure."}), 500
-
-        # Ensure all resources have a URL, even if placeholder
-        for concept_data in final_kg_structure.values():
-            for resource in concept_data.get('resources', []):
-                if 'url' not in resource or not resource['url']:
-                    resource['url'] = "https://example.com/placeholder_resource";
-
-        # Cache the generated knowledge graph
-        knowledge_graph_cache[topic] = final_kg_structure
-        print(f"Generated and cached knowledge graph for topic: '{topic}'")
-        print(f"Final KG structure sent to frontend: {final_kg_structure}")
-        return jsonify({"knowledge_graph": final_kg_structure})
-    else:
+    if not generated_kg:
         print("Error: LLM failed to generate knowledge graph.")
-        return jsonify({"error": "Failed to generate knowledge graph from AI model."}), 500
+        raise KnowledgeGraphGenerationError("Failed to generate knowledge graph from AI model.")
+
+    final_kg_structure = coerce_generated_graph(generated_kg)
+    if final_kg_structure is None:
+        raise KnowledgeGraphGenerationError("Generated knowledge graph has an unexpected top-level structure.")
+    return final_kg_structure
+
+def generate_delta_knowledge_graph(topic: str, known_graph: dict) -> dict:
+    """
+    Asks Gemini only for the concepts of the topic that are missing from known_graph,
+    and which known concepts belong to the topic. Returns the topic's raw knowledge graph
+    (reused concepts with their prerequisites plus the new ones), or None if the
+    model's answer is unusable and a full generation should be done instead.
+    """
+    known_concepts_str = "\n".join([
+        f"- {concept}: Prerequisites: [{', '.join(data.get('prerequisites', []))}]"
+        for concept, data in known_graph.items()
+    ])
+
+    delta_prompt = f"""
+        You are an AI assistant specialized in extending structured knowledge graphs for educational purposes.
+        A knowledge graph is being built for the topic below. These concepts ALREADY EXIST, with their prerequisites:
+        {known_concepts_str}
+
+        Return a JSON object with exactly two keys:
+        - "reused_concepts": An array with the names of the existing concepts above that belong in a knowledge graph for the topic.
+          Use the names exactly as written above.
+        - "new_concepts": A JSON object whose keys are the names of concepts the topic needs that are NOT listed above.
+          Each value MUST be an object containing:
+            - "prerequisites": An array of concept names (existing or new) that must be learned before this concept.
+            - "resources": An array of objects, each with "type" (e.g., "video", "article", "book"), "title" and "url".
+          Ensure each new concept has at least 3 articles, 2 video links and 1 book, with accurate titles and URLs.
+          If a real URL is not available, use "https://example.com/placeholder_resource".
+
+        Do not repeat existing concepts in "new_concepts". Aim for 8-12 core concepts for the topic in total.
+
+        **Topic:** {topic}
+    """
+
+    delta_schema = {
+        "type": "OBJECT",
+        "properties": {
+            "reused_concepts": {
+                "type": "ARRAY",
+                "items": {"type": "STRING"}
+            },
+            "new_concepts": {
+                "type": "OBJECT"
+            }
+        },
+        "required": ["reused_concepts", "new_concepts"]
+    }
+
+    delta_result = call_gemini_api(delta_prompt, delta_schema)
+    if not isinstance(delta_result, dict) or "new_concepts" not in delta_result:
+        print("Warning: LLM returned an unusable delta; falling back to full generation.")
+        return None
+
+    new_concepts = coerce_generated_graph(delta_result.get("new_concepts"))
+    if new_concepts is None:
+        return None
+
+    reused = [name for name in delta_result.get("reused_concepts", []) if isinstance(name, str)]
+    # "New" concepts the store already knows are reused as stored rather than dropped
+    already_known = [name for name in new_concepts if concept_store.find(name) is not None]
+    # Pull in prerequisites of reused concepts and existing concepts that new ones build on
+    referenced = reused + already_known + [
+        prereq for data in new_concepts.values() if isinstance(data, dict)
+        for prereq in data.get('prerequisites', []) if isinstance(prereq, str)
+    ]
+    topic_graph = concept_store.subgraph(referenced)
+    print(f"Delta generation for '{topic}': reused {len(topic_graph)} concepts, generated {len(new_concepts) - len(already_known)} new ones")
+
+    for name, data in new_concepts.items():
+        if name not in already_known:
+            topic_graph[name] = data
+    return topic_graph
+
+def generate_and_cache_knowledge_graph(topic: str, incremental: bool = True) -> dict:
+    """
+    Generates the knowledge graph for a topic with Gemini, normalizes it and caches it.
+    When the shared concept store already knows concepts related to the topic, only the
+    missing concepts are generated. Runs on the generation job pool; raises
+    KnowledgeGraphGenerationError on failure.
+    """
+    print(f"Generating knowledge graph for topic: '{topic}'")
+
+    final_kg_structure = None
+    if incremental:
+        known_graph = concept_store.related_concepts(topic)
+        if len(known_graph) >= MIN_KNOWN_CONCEPTS_FOR_DELTA:
+            final_kg_structure = generate_delta_knowledge_graph(topic, known_graph)
+    if not final_kg_structure:
+        final_kg_structure = generate_full_knowledge_graph(topic)
+
+    # Normalize names, resolve prerequisites and break cycles once, at ingest
+    final_kg_structure, validation_report = run_cpu_bound(normalize_knowledge_graph, final_kg_structure)
+
+    # Cache the generated knowledge graph along with its precomputed layout
+    cache_knowledge_graph(topic, final_kg_structure, validation_report)
+    print(f"Generated and cached knowledge graph for topic: '{topic}'")
+    print(f"Final KG structure: {final_kg_structure}")
+    return {"topic": topic}
+
+def job_status_payload(job: dict, include_resources=True) -> dict:
+    """
+    Builds the status response for a generation job. Finished jobs carry the cached graph payload.
+    """
+    payload = {
+        "job_id": job["job_id"],
+        "topic": job["key"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['job_id']}",
+        "events_url": f"/jobs/{job['job_id']}/events",
+    }
+    if job["status"] == JOB_SUCCEEDED and job["key"] in knowledge_graph_cache:
+        payload.update(cached_knowledge_graph_payload(job["key"], include_resources))
+    elif job["status"] == JOB_FAILED:
+        payload["error"] = job["error"]
+    return payload
+
+@app.route('/generate_knowledge_graph', methods=['POST'])
+def generate_knowledge_graph_endpoint():
+    """
+    API endpoint to dynamically generate a knowledge graph based on a topic.
+    Caches the knowledge graph for subsequent requests.
+    """
+    data = request.get_json()
+    requested_topic = data.get('topic', '').strip()
+    # Clients that load resources on demand ask for the graph without them ("table" sends each resource once)
+    include_resources = parse_include_resources(data.get('include_resources', True))
+    # Incremental mode only generates the concepts the concept store does not know yet
+    incremental = data.get('incremental', True) is not False
+
+    if not requested_topic:
+        return jsonify({"error": "Topic is required to generate knowledge graph."}), 400
+
+    # Map the topic onto an already cached one where possible ("ML", "intro to machine learning", ...)
+    with span("graph_lookup") as lookup_span:
+        topic, topic_match = topic_resolver.resolve(requested_topic)
+        cached = topic in knowledge_graph_cache
+        lookup_span.set(tier="cache" if cached else "generate", topic_match=topic_match)
+
+    # Check if the knowledge graph for the topic is already cached
+    if cached:
+        print(f"Returning cached knowledge graph for topic: '{topic}' (requested '{requested_topic}', {topic_match} match)")
+        return jsonify({**cached_knowledge_graph_payload(topic, include_resources), "topic_match": topic_match})
+
+    # Generation runs as a job deduplicated by topic, so concurrent requests for the same topic
+    # (e.g. a user reloading mid-generation) share one Gemini call
+    job, created = generation_jobs.submit(topic, generate_and_cache_knowledge_graph, topic, incremental)
+    if created:
+        print(f"Started generation job {job['job_id']} for topic: '{topic}'")
+
+    if data.get('async'):
+        # Job mode: return immediately; the client polls /jobs/<job_id> or subscribes to its events
+        return jsonify(job_status_payload(job, include_resources)), 202
+
+    # The generation itself runs on the job pool, outside this request's trace
+    with span("generation_job_wait", created=created):
+        while job and job["status"] not in FINISHED_STATES:
+            job = generation_jobs.wait_for_change(job["job_id"], job["status"], timeout=JOB_WAIT_SECONDS)
+    if not job or job["status"] == JOB_FAILED:
+        return jsonify({"error": job["error"] if job else "Knowledge graph generation job expired."}), 500
+    return jsonify({**cached_knowledge_graph_payload(topic, include_resources), "topic_match": topic_match})
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status_endpoint(job_id):
+    """
+    API endpoint to poll a knowledge graph generation job.
+    Returns the graph once the job has succeeded. Query parameter: include_resources (default true).
+    """
+    job = generation_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    include_resources = parse_include_resources(request.args.get('include_resources', 'true'))
+    return jsonify(job_status_payload(job, include_resources))
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events_endpoint(job_id):
+    """
+    Server-Sent Events stream for a generation job. Emits a "status" event on every
+    status change and closes after the final one, which carries the result.
+    """
+    job = generation_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job."}), 404
+    include_resources = parse_include_resources(request.args.get('include_resources', 'true'))
+
+    def stream(job):
+        while True:
+            yield f"event: status\ndata: {json.dumps(job_status_payload(job, include_resources))}\n\n"
+            if job["status"] in FINISHED_STATES:
+                return
+            last_status = job["status"]
+            while True:
+                job = generation_jobs.wait_for_change(job_id, last_status, timeout=JOB_WAIT_SECONDS)
+                if job is None:
+                    return
+                if job["status"] != last_status:
+                    break
+                yield ": keep-alive\n\n"
+
+    return Response(stream(job), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/knowledge_graph/snapshot', methods=['GET'])
+def export_knowledge_graph_snapshot_endpoint():
+    """
+    API endpoint exporting a cached knowledge graph as a binary snapshot (see kg_snapshot.py).
+    Query parameter: topic.
+    """
+    topic = resolve_topic(request.args.get('topic', ''))
+    if topic not in knowledge_graph_cache:
+        return jsonify({"error": f"No knowledge graph cached for topic '{topic}'."}), 404
+
+    snapshot = run_cpu_bound(dumps_snapshot, knowledge_graph_cache[topic])
+    return Response(snapshot, mimetype='application/octet-stream', headers={
+        'Content-Disposition': f'attachment; filename="{topic.replace(" ", "_")}.kgs"'
+    })
+
+@app.route('/knowledge_graph/snapshot', methods=['POST'])
+def import_knowledge_graph_snapshot_endpoint():
+    """
+    API endpoint importing a binary snapshot (request body) as the knowledge graph of a topic.
+    Query parameter: topic. The graph goes through the same ingest normalization as uploads.
+    """
+    topic = normalize_topic(request.args.get('topic', '').strip())
+    if not topic:
+        return jsonify({"error": "Topic is required to import a knowledge graph snapshot."}), 400
+
+    try:
+        raw_kg = KnowledgeGraphSnapshot(request.get_data()).to_dict()
+    except SnapshotError as e:
+        return jsonify({"error": f"Invalid knowledge graph snapshot: {e}"}), 400
+
+    cleaned_kg, validation_report = run_cpu_bound(normalize_knowledge_graph, raw_kg)
+    cache_knowledge_graph(topic, cleaned_kg, validation_report)
+    print(f"Imported knowledge graph snapshot for topic: '{topic}' ({len(cleaned_kg)} concepts)")
+    return jsonify(cached_knowledge_graph_payload(topic, include_resources=False))
+
+@app.route('/topic_aliases', methods=['POST'])
+def topic_aliases_endpoint():
+    """
+    API endpoint to maintain the topic alias table, e.g. {"alias": "Statistical Learning", "topic": "Machine Learning"}.
+    Requests for the alias are then served from the topic's cached knowledge graph.
+    """
+    data = request.get_json()
+    alias = data.get('alias', '').strip()
+    topic = normalize_topic(data.get('topic', '').strip())
+
+    if not alias or not topic:
+        return jsonify({"error": "Both alias and topic are required."}), 400
 
+    topic_resolver.add_alias(alias, topic)
+    return jsonify({"alias": normalize_topic(alias), "canonical_topic": topic})
+
+@app.route('/upload_knowledge_graph', methods=['POST'])
+def upload_knowledge_graph_endpoint():
+    """
+    API endpoint to register a user-supplied knowledge graph under a topic.
+    The graph goes through the same ingest normalization as generated graphs.
+    """
+    data = request.get_json()
+    topic = normalize_topic(data.get('topic', '').strip())
+    raw_kg = data.get('knowledge_graph')
+
+    if not topic or not isinstance(raw_kg, dict) or not raw_kg:
+        return jsonify({"error": "Topic and a non-empty knowledge_graph object are required."}), 400
+
+    cleaned_kg, validation_report = normalize_knowledge_graph(raw_kg)
+    payload = cache_knowledge_graph(topic, cleaned_kg, validation_report)
+    print(f"Uploaded and cached knowledge graph for topic: '{topic}' ({len(cleaned_kg)} concepts)")
+    return jsonify(payload)
+
+@app.route('/knowledge_graph/summary', methods=['GET'])
+def knowledge_graph_summary_endpoint():
+    """
+    API endpoint returning a page of a cached graph's concept IDs, names and edges, without resources.
+    Query parameters: topic, offset, limit.
+    """
+    topic = resolve_topic(request.args.get('topic', ''))
+    view = get_graph_view(topic)
+    if view is None:
+        return jsonify({"error": f"No knowledge graph cached for topic '{topic}'."}), 404
+
+    offset, limit = clamp_page(request.args.get('offset'), request.args.get('limit'))
+    return jsonify(view.summary(offset, limit))
+
+@app.route('/knowledge_graph/neighborhood', methods=['GET'])
+def knowledge_graph_neighborhood_endpoint():
+    """
+    API endpoint returning a page of the k-hop neighborhood around a concept of a cached graph.
+    Query parameters: topic, concept (name) or id, hops (default 1), offset, limit.
+    """
+    topic = resolve_topic(request.args.get('topic', ''))
+    view = get_graph_view(topic)
+    if view is None:
+        return jsonify({"error": f"No knowledge graph cached for topic '{topic}'."}), 404
+
+    concept_id = view.resolve(request.args.get('id'), request.args.get('concept'))
+    if concept_id is None:
+        return jsonify({"error": "Unknown concept."}), 404
+
+    hops = request.args.get('hops', 1, type=int)
+    offset, limit = clamp_page(request.args.get('offset'), request.args.get('limit'))
+    return jsonify(view.neighborhood(concept_id, hops, offset, limit))
+
+@app.route('/knowledge_graph/resources', methods=['GET'])
+def knowledge_graph_resources_endpoint():
+    """
+    API endpoint returning a page of the resources of one concept of a cached graph.
+    Query parameters: topic, concept (name) or id, offset, limit.
+    """
+    topic = resolve_topic(request.args.get('topic', ''))
+    view = get_graph_view(topic)
+    if view is None:
+        return jsonify({"error": f"No knowledge graph cached for topic '{topic}'."}), 404
+
+    concept_id = view.resolve(request.args.get('id'), request.args.get('concept'))
+    if concept_id is None:
+        return jsonify({"error": "Unknown concept."}), 404
+
+    offset, limit = clamp_page(request.args.get('offset'), request.args.get('limit'))
+    return jsonify(view.resources(concept_id, offset, limit))
+
+@app.route('/concepts/suggest', methods=['GET'])
+def suggest_concepts_endpoint():
+    """
+    Autocomplete for goals: names of concepts of a topic's graph (the default graph for
+    uncached topics) matching the typed prefix, best first.
+    Query parameters: q, topic, limit (at most MAX_SUGGESTIONS). Responses are cacheable.
+    """
+    query = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', MAX_SUGGESTIONS))
+    except ValueError:
+        limit = MAX_SUGGESTIONS
+    topic = resolve_topic(request.args.get('topic', ''))
+    key = topic if topic in knowledge_graph_cache else None
+    trie = concept_tries.get(key)
+    if trie is None:
+        trie = concept_tries[key] = ConceptTrie(DEFAULT_KNOWLEDGE_GRAPH)
+    with span("suggest"):
+        suggestions = trie.suggest(query, limit)
+
+    response = jsonify({"query": query, "topic": topic, "suggestions": suggestions})
+    # A topic's graph can be replaced, so suggestions are only cached briefly and then revalidated
+    response.headers['Cache-Control'] = 'public, max-age=30'
+    response.add_etag()
+    return response.make_conditional(request)
+
+@app.route('/resources/<int:resource_id>', methods=['GET'])
+def get_resource_endpoint(resource_id):
+    """
+    API endpoint returning one resource of the shared resource registry by ID.
+    """
+    resource = resource_registry.get(resource_id)
+    if resource is None:
+        return jsonify({"error": "Unknown resource."}), 404
+    return jsonify({**resource, "id": resource_id})
+
+@app.route('/resources/<int:resource_id>', methods=['PATCH'])
+def update_resource_endpoint(resource_id):
+    """
+    API endpoint updating a resource's metadata, e.g. {"verified": true}. The change
+    applies to every concept and topic that lists the resource. Only the metadata fields
+    in resource_registry.UPDATABLE_FIELDS can be changed; url, type and title identify the resource.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict) or not data:
+        return jsonify({"error": "A JSON object of fields to update is required."}), 400
+    try:
+        resource = resource_registry.update(resource_id, data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if resource is None:
+        return jsonify({"error": "Unknown resource."}), 404
+    return jsonify({**resource, "id": resource_id})
+
+def get_learning_frontier(learner_id: str, topic: str) -> LearningFrontier:
+    """
+    Returns the learner's frontier on a topic's graph (the default graph for uncached topics),
+    building it from the progress store on first use or after the graph was replaced.
+    """
+    knowledge_graph = knowledge_graph_cache.get(topic) or DEFAULT_KNOWLEDGE_GRAPH
+    frontier = learning_frontiers.get((learner_id, topic))
+    if frontier is None or frontier.knowledge_graph is not knowledge_graph:
+        known_concepts, _ = progress_store.get(learner_id, topic)
+        frontier = LearningFrontier(knowledge_graph, known_concepts)
+        # Evicted frontiers are rebuilt from the progress store if needed again
+        put_bounded(learning_frontiers, (learner_id, topic), frontier, MAX_LEARNING_FRONTIERS)
+    return frontier
+
+def put_bounded(cache: dict, key, value, max_entries: int):
+    """
+    Stores a cache entry, evicting the oldest entry once the cache holds max_entries.
+    """
+    if key not in cache and len(cache) >= max_entries:
+        cache.pop(next(iter(cache)), None)
+    cache[key] = value
+
+def progress_payload(learner_id: str, topic: str, known_concepts: set, struggling_concepts: set) -> dict:
+    """
+    Builds the response payload describing a learner's progress on a topic,
+    including the concepts that are ready to learn next.
+    """
+    return {
+        "learner_id": learner_id,
+        "topic": topic,
+        "known_concepts": sorted(known_concepts),
+        "struggling_concepts": sorted(struggling_concepts),
+        "ready_concepts": get_learning_frontier(learner_id, topic).ready_concepts(),
+    }
+
+@app.route('/progress', methods=['GET'])
+def get_progress_endpoint():
+    """
+    API endpoint returning a learner's known and struggling concepts for a topic.
+    Query parameters: learner_id, topic.
+    """
+    learner_id = request.args.get('learner_id', '').strip()
+    if not learner_id:
+        return jsonify({"error": "learner_id is required."}), 400
+
+    topic = resolve_topic(request.args.get('topic', ''))
+    known_concepts, struggling_concepts = progress_store.get(learner_id, topic)
+    return jsonify(progress_payload(learner_id, topic, known_concepts, struggling_concepts))
+
+@app.route('/progress', methods=['POST'])
+def update_progress_endpoint():
+    """
+    API endpoint applying one progress delta, e.g.
+    {"learner_id": "...", "topic": "...", "concept": "Supervised Learning", "state": "known"}.
+    state is "known", "struggling" or null to clear the concept.
+    """
+    data = request.get_json()
+    learner_id = data.get('learner_id', '').strip()
+    concept = data.get('concept', '').strip()
+    state = data.get('state')
+
+    if not learner_id or not concept:
+        return jsonify({"error": "learner_id and concept are required."}), 400
+    if state is not None and state not in VALID_STATES:
+        return jsonify({"error": f"state must be one of {list(VALID_STATES)} or null."}), 400
+
+    topic = resolve_topic(data.get('topic', ''))
+    known_concepts, struggling_concepts = progress_store.mark(learner_id, topic, concept, state)
+    # Only the concepts that depend on this one are updated
+    frontier = get_learning_frontier(learner_id, topic)
+    if state == STATE_KNOWN:
+        frontier.mark_known(concept)
+    else:
+        frontier.mark_unknown(concept)
+    # Earlier speculation assumed the previous state; precompute the likely next paths instead
+    speculator.cancel((learner_id, topic))
+    speculate_next_paths(learner_id, topic)
+    return jsonify(progress_payload(learner_id, topic, known_concepts, struggling_concepts))
+
+@app.route('/progress', methods=['DELETE'])
+def reset_progress_endpoint():
+    """
+    API endpoint clearing a learner's progress on a topic. Query parameters: learner_id, topic.
+    """
+    learner_id = request.args.get('learner_id', '').strip()
+    if not learner_id:
+        return jsonify({"error": "learner_id is required."}), 400
+
+    topic = resolve_topic(request.args.get('topic', ''))
+    progress_store.reset(learner_id, topic)
+    learning_frontiers.pop((learner_id, topic), None)
+    learner_path_state.pop((learner_id, topic), None)
+    speculator.cancel((learner_id, topic))
+    return jsonify(progress_payload(learner_id, topic, set(), set()))
+
+@app.route('/frontier', methods=['GET'])
+def frontier_endpoint():
+    """
+    API endpoint returning the concepts a learner is ready to learn next on a topic:
+    those not known yet whose prerequisites are all known. Query parameters: learner_id, topic.
+    """
+    learner_id = request.args.get('learner_id', '').strip()
+    if not learner_id:
+        return jsonify({"error": "learner_id is required."}), 400
+
+    topic = resolve_topic(request.args.get('topic', ''))
+    return jsonify({
+        "learner_id": learner_id,
+        "topic": topic,
+        "ready_concepts": get_learning_frontier(learner_id, topic).ready_concepts(),
+    })
 
 @app.route('/generate_path', methods=['POST'])
 def generate_path_endpoint():
     """
     API endpoint to generate the learning path.
     Receives data from the frontend and calls the Gemini API.
-    Now accepts the knowledge_graph from the frontend.
+    Accepts the knowledge_graph from the frontend, or the topic of a cached graph.
+    Known and struggling concepts come from the request, or from the progress store given a learner_id.
+    Accepts a single "goal" or a list of "goals" with optional weights, planned in one Gemini call.
     """
     data = request.get_json()
-    goal = data.get('goal', '')
-    known_concepts = set(data.get('known_concepts', []))
-    struggling_concepts = set(data.get('struggling_concepts', []))
-    # Get the dynamically generated knowledge graph from the request body
-    dynamic_knowledge_graph = data.get('knowledge_graph', DEFAULT_KNOWLEDGE_GRAPH)
+    try:
+        goals = parse_goals(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    goal = describe_goals(goals) if goals else ''
+    # Get the dynamically generated knowledge graph from the request body, else from the cache by topic
+    with span("graph_lookup") as lookup_span:
+        topic = resolve_topic(data.get('topic', ''))
+        learner_id = data.get('learner_id', '').strip()
+        if learner_id and 'known_concepts' not in data and 'struggling_concepts' not in data:
+            # Learners with server-side progress only send their ID
+            known_concepts, struggling_concepts = progress_store.get(learner_id, topic)
+        else:
+            known_concepts = set(data.get('known_concepts', []))
+            struggling_concepts = set(data.get('struggling_concepts', []))
+        if data.get('knowledge_graph'):
+            dynamic_knowledge_graph, tier = data['knowledge_graph'], "request"
+        elif topic in knowledge_graph_cache:
+            dynamic_knowledge_graph, tier = knowledge_graph_cache[topic], "cache"
+        else:
+            dynamic_knowledge_graph, tier = DEFAULT_KNOWLEDGE_GRAPH, "default"
+        lookup_span.set(tier=tier, concepts=len(dynamic_knowledge_graph))
 
     print(f"Received request for path: Goal='{goal}', Known={known_concepts}, Struggling={struggling_concepts}")
     print(f"Using dynamic knowledge graph for path generation (first 3 concepts): {list(dynamic_knowledge_graph.keys())[:3]}...")
 
+    # Paths for a shared graph are cached (also by speculation) and can be batched;
+    # graphs sent in the request body are not shared
+    shared_graph = tier != "request"
+    cached_path = get_cached_path(topic, goal, known_concepts, struggling_concepts, dynamic_knowledge_graph) if shared_graph else None
+    if cached_path is not None:
+        print("Serving path from the path cache.")
+        repaired_path, repair_report = cached_path["path"], cached_path["repair_report"]
+    else:
+        with speculator.foreground():
+            path_request = (goal, known_concepts, struggling_concepts, dynamic_knowledge_graph)
+            if PATH_BATCH_WINDOW_SECONDS > 0 and shared_graph:
+                with span("path_batch"):
+                    generated_path_list = path_batcher.submit((topic, id(dynamic_knowledge_graph)), path_request)
+            else:
+                generated_path_list = request_learning_path(*path_request)
+
+        if generated_path_list is None:
+            print("Error: call_gemini_api returned empty result for path generation.")
+            return jsonify({"error": "Failed to generate learning path from AI model."}), 500
+
+        with span("compute_path") as path_span:
+            # Drop unknown and known concepts, add missing prerequisites and fix their order locally
+            # rather than asking the model again
+            repaired_path, repair_report = repair_learning_path(generated_path_list, known_concepts, dynamic_knowledge_graph)
+            path_span.set(repaired=not repair_report["valid"])
+            if not repair_report["valid"]:
+                print(f"Repaired generated path: {repair_report}")
+            print("Filtered path:", repaired_path)
+        if shared_graph:
+            store_cached_path(topic, goal, known_concepts, struggling_concepts, dynamic_knowledge_graph, repaired_path, repair_report)
+
+    if learner_id and shared_graph and 'known_concepts' not in data and 'struggling_concepts' not in data:
+        # The learner's state lives on the server, so their next request can be predicted and precomputed
+        put_bounded(learner_path_state, (learner_id, topic), (goal, repaired_path), MAX_LEARNING_FRONTIERS)
+        speculate_next_paths(learner_id, topic)
+    return jsonify({"path": repaired_path, "repair_report": repair_report, "cached": cached_path is not None})
+
+def path_cache_key(topic: str, goal: str, known_concepts, struggling_concepts) -> tuple:
+    return (topic, goal, frozenset(known_concepts), frozenset(struggling_concepts))
+
+def get_cached_path(topic: str, goal: str, known_concepts, struggling_concepts, knowledge_graph: dict):
+    """
+    Returns the cached {"path", "repair_report"} for a learner state, or None.
+    Entries computed against a graph that has since been replaced are ignored.
+    """
+    entry = path_cache.get(path_cache_key(topic, goal, known_concepts, struggling_concepts))
+    if entry is None or entry["graph"] is not knowledge_graph:
+        return None
+    return entry
+
+def store_cached_path(topic: str, goal: str, known_concepts, struggling_concepts, knowledge_graph: dict, path: list, repair_report: dict):
+    key = path_cache_key(topic, goal, known_concepts, struggling_concepts)
+    put_bounded(path_cache, key, {"graph": knowledge_graph, "path": path, "repair_report": repair_report}, PATH_CACHE_SIZE)
+
+def speculate_learning_path(cancelled, topic: str, goal: str, known_concepts: set, struggling_concepts: set, knowledge_graph: dict):
+    """
+    Speculative task: generates and caches the path for a likely next learner state,
+    unless it is cached already, the task was cancelled or the speculation quota is spent.
+    """
+    if cancelled.is_set() or get_cached_path(topic, goal, known_concepts, struggling_concepts, knowledge_graph) is not None:
+        return
+    if not speculator.acquire_quota():
+        print("Skipping speculative path generation: quota exhausted.")
+        return
+    generated_path_list = request_learning_path(goal, known_concepts, struggling_concepts, knowledge_graph)
+    if generated_path_list is None:
+        return
+    repaired_path, repair_report = repair_learning_path(generated_path_list, known_concepts, knowledge_graph)
+    store_cached_path(topic, goal, known_concepts, struggling_concepts, knowledge_graph, repaired_path, repair_report)
+    print(f"Speculatively cached path for topic '{topic}' with {len(known_concepts)} known concepts.")
+
+def speculate_next_paths(learner_id: str, topic: str):
+    """
+    Schedules precomputation of the paths a learner most likely requests next: for their
+    current state, and for the state after completing the next concept of their last path.
+    """
+    state = learner_path_state.get((learner_id, topic))
+    if state is None or SPECULATIVE_CALLS_PER_MINUTE <= 0:
+        return
+    goal, last_path = state
+    knowledge_graph = knowledge_graph_cache.get(topic) or DEFAULT_KNOWLEDGE_GRAPH
+    known_concepts, struggling_concepts = progress_store.get(learner_id, topic)
+
+    next_states = [(known_concepts, struggling_concepts)]
+    next_concept = next((c for c in last_path if c not in known_concepts), None)
+    if next_concept is not None:
+        next_states.append((known_concepts | {next_concept}, struggling_concepts - {next_concept}))
+    for known, struggling in next_states:
+        if get_cached_path(topic, goal, known, struggling, knowledge_graph) is None:
+            speculator.speculate(
+                (learner_id, topic), path_cache_key(topic, goal, known, struggling),
+                speculate_learning_path, topic, goal, known, struggling, knowledge_graph,
+            )
+
+def coerce_path_list(generated_path_list) -> list:
+    """
+    Returns the path generated by the LLM as a list of concept names.
+    """
+    if not isinstance(generated_path_list, list):
+        print(f"Warning: LLM returned non-list for path: {generated_path_list}. Attempting to convert.")
+        # Try to convert to list if it's a single string or other unexpected type
+        if isinstance(generated_path_list, str):
+            try:
+                generated_path_list = json.loads(generated_path_list)  # Might be a JSON string of a list
+            except json.JSONDecodeError:
+                generated_path_list = [generated_path_list]  # Treat as single concept
+        else:
+            generated_path_list = []  # Fallback to empty list
+    return generated_path_list if isinstance(generated_path_list, list) else []
+
+def request_learning_path(goal: str, known_concepts: set, struggling_concepts: set, knowledge_graph: dict):
+    """
+    Asks Gemini for one learner's path. Returns the path as a list, or None if the call failed.
+    """
     # Pass the dynamic knowledge graph to the prompt builder
-    prompt_text = build_gemini_prompt(goal, known_concepts, struggling_concepts, dynamic_knowledge_graph)
+    with span("build_prompt"):
+        prompt_text = build_gemini_prompt(goal, known_concepts, struggling_concepts, knowledge_graph)
     print(f"\n--- Prompt sent to Gemini API for Path ---\n{prompt_text}\n----------------------------------")
 
     # The response schema for path generation remains the same
@@ -282,27 +1048,96 @@ def generate_path_endpoint():
     }
 
     path_result = call_gemini_api(prompt_text, path_schema)
+    if not path_result:
+        return None
+    return coerce_path_list(path_result.get('path', []))
 
-    if path_result:
-        # Filter out known concepts before sending to UI
-        # Ensure path_result.get('path', []) is a list before filtering
-        generated_path_list = path_result.get('path', [])
-        if not isinstance(generated_path_list, list):
-            print(f"Warning: LLM returned non-list for path: {generated_path_list}. Attempting to convert.")
-            # Try to convert to list if it's a single string or other unexpected type
-            if isinstance(generated_path_list, str):
-                try:
-                    generated_path_list = json.loads(generated_path_list)  # Might be a JSON string of a list
-                except json.JSONDecodeError:
-                    generated_path_list = [generated_path_list]  # Treat as single concept
-            else:
-                generated_path_list = []  # Fallback to empty list
-        filtered_path = [concept for concept in generated_path_list if concept in dynamic_knowledge_graph and concept not in known_concepts]
-        print("Filtered path:", filtered_path)
-        return jsonify({"path": filtered_path})
-    else:
-        print("Error: call_gemini_api returned empty result for path generation.")
-        return jsonify({"error": "Failed to generate learning path from AI model."}), 500
+def generate_learning_paths_batch(batch_key, path_requests: list) -> list:
+    """
+    Generates the paths of several learners on the same knowledge graph with one Gemini call.
+    path_requests holds (goal, known_concepts, struggling_concepts, knowledge_graph) tuples;
+    returns one path (or None on failure) per request, in order. Requests the batched
+    response does not cover are retried on their own.
+    """
+    if len(path_requests) == 1:
+        return [request_learning_path(*path_requests[0])]
+
+    request_ids = [f"r{i}" for i in range(len(path_requests))]
+    with span("build_prompt", batch_size=len(path_requests)):
+        prompt_text = build_batched_gemini_prompt(list(zip(request_ids, path_requests)), path_requests[0][3])
+    print(f"\n--- Batched prompt sent to Gemini API for {len(path_requests)} paths ---\n{prompt_text}\n----------------------------------")
+
+    # One path per request ID
+    batch_schema = {
+        "type": "OBJECT",
+        "properties": {
+            "paths": {
+                "type": "OBJECT",
+                "properties": {request_id: {"type": "ARRAY", "items": {"type": "STRING"}} for request_id in request_ids},
+                "required": request_ids
+            }
+        },
+        "required": ["paths"]
+    }
+
+    batch_result = call_gemini_api(prompt_text, batch_schema)
+    if not batch_result:
+        return [None] * len(path_requests)
+    paths = batch_result.get('paths', {}) if isinstance(batch_result.get('paths'), dict) else {}
+
+    results = []
+    for request_id, path_request in zip(request_ids, path_requests):
+        if request_id in paths:
+            results.append(coerce_path_list(paths[request_id]))
+        else:
+            print(f"Batched response is missing path {request_id}; requesting it separately.")
+            results.append(request_learning_path(*path_request))
+    return results
+
+path_batcher = MicroBatcher(generate_learning_paths_batch, window_seconds=PATH_BATCH_WINDOW_SECONDS, max_batch_size=PATH_BATCH_MAX_SIZE)
+
+def build_batched_gemini_prompt(path_requests: list, current_knowledge_graph: dict) -> str:
+    """
+    Builds one prompt asking for the learning paths of several learners on the same
+    knowledge graph. path_requests holds (request_id, (goal, known, struggling, graph)) pairs;
+    the graph is included once for all of them.
+    """
+    knowledge_graph_str = "\n".join([
+        f"- {concept}: Prerequisites: [{', '.join(data.get('prerequisites', []))}]"
+        for concept, data in current_knowledge_graph.items()
+    ])
+    learners_str = "\n".join([
+        f"- {request_id}: Goal(s): {goal if goal else 'Understand Machine Learning Concepts'}; "
+        f"Known: {', '.join(known) if known else 'None'}; "
+        f"Struggling (prioritize review/re-explanation): {', '.join(struggling) if struggling else 'None'}"
+        for request_id, (goal, known, struggling, _) in path_requests
+    ])
+
+    prompt = f"""
+        You are an AI assistant specialized in creating personalized learning paths for Learning Experience.
+        Based on each user's goal, their current knowledge, and a shared knowledge graph, generate a sequential learning path for every user below.
+
+        **Users (request ID, goal, known concepts, struggling concepts):**
+        {learners_str}
+
+        **Available Concepts and their Prerequisites (Knowledge Graph):**
+        {knowledge_graph_str}
+
+        **Instructions (apply to each user independently):**
+        1. Generate a learning path as a JSON array of concept names.
+        2. Ensure all prerequisites for a concept are listed before the concept itself in the path.
+        3. Prioritize concepts the user is struggling with by placing them earlier or suggesting a review. If a struggling concept's prerequisites are not met, suggest the prerequisites first.
+        4. Avoid including concepts the user already knows, unless they are prerequisites for a new, unknown concept.
+        5. The path should be logical and progressive towards the user's goal.
+        6. If the goal is too broad or already mostly known, suggest next steps or more advanced topics.
+        7. Only include concepts from the provided KNOWLEDGE_GRAPH.
+        8. If a user has several goals, produce one merged path covering all of them: list shared prerequisites once, and reach goals with a higher weight first.
+        9. The output MUST be a JSON object with a single key "paths" mapping every request ID to that user's path.
+
+        **Example JSON Output:**
+        {{"paths": {{"r0": ["Introduction to ML", "Supervised Learning"], "r1": ["Deep Learning Basics"]}}}}
+    """
+    return prompt
 
 def build_gemini_prompt(goal: str, user_known_concepts: set, user_struggling_concepts: set, current_knowledge_graph: dict) -> str:
     """
@@ -326,7 +1161,7 @@ def build_gemini_prompt(goal: str, user_known_concepts: set, user_struggling_con
         You are an AI assistant specialized in creating personalized learning paths for Learning Experience.
         Based on the user's goal, their current knowledge, and a provided knowledge graph, generate a sequential learning path.
 
-        **User's Goal:** {goal if goal else 'Understand Machine Learning Concepts'}
+        **User's Goal(s):** {goal if goal else 'Understand Machine Learning Concepts'}
         **User's Known Concepts:** {', '.join(user_known_concepts) if user_known_concepts else 'None'}
         **User's Struggling Concepts (prioritize review/re-explanation):** {', '.join(user_struggling_concepts) if user_struggling_concepts else 'None'}
 
@@ -341,17 +1176,33 @@ def build_gemini_prompt(goal: str, user_known_concepts: set, user_struggling_con
         5. The path should be logical and progressive towards the user's goal.
         6. If the goal is too broad or already mostly known, suggest next steps or more advanced topics.
         7. Only include concepts from the provided KNOWLEDGE_GRAPH.
-        8. The output MUST be a JSON object with a single key "path" which is an array of strings (concept names).
+        8. If there are several goals, produce one merged path covering all of them: list shared prerequisites once, and reach goals with a higher weight first.
+        9. The output MUST be a JSON object with a single key "path" which is an array of strings (concept names).
 
         **Example JSON Output:**
         {{"path": ["Introduction to ML", "Supervised Learning", "Deep Learning Basics"]}}
     """
     return prompt
 
+def get_retrieval_index(topic: str, knowledge_graph: dict) -> KnowledgeGraphIndex:
+    """
+    Returns the retrieval index for a cached topic, building it on first use.
+    Graphs that are not cached (e.g. sent in the request body) get a throwaway index.
+    """
+    if topic and knowledge_graph_cache.get(topic) is knowledge_graph:
+        index = retrieval_index_cache.get(topic)
+        if index is None or index.knowledge_graph is not knowledge_graph:
+            index = KnowledgeGraphIndex(knowledge_graph)
+            retrieval_index_cache[topic] = index
+        return index
+    return KnowledgeGraphIndex(knowledge_graph)
+
 @app.route('/chat', methods=['POST'])
 def chat_endpoint():
     """
     API endpoint to handle chat interactions with Gemini.
+    The concepts of the active knowledge graph that are relevant to the question
+    are retrieved locally and injected into the prompt.
     """
     data = request.get_json()
     question = data.get('question', '').strip()
@@ -361,10 +1212,22 @@ def chat_endpoint():
 
     print(f"Received chat question: {question}")
 
+    # Use the cached graph for the topic if available, else the one sent by the frontend, else the default
+    with span("graph_lookup"):
+        topic = resolve_topic(data.get('topic', ''))
+        knowledge_graph = knowledge_graph_cache.get(topic) or data.get('knowledge_graph') or DEFAULT_KNOWLEDGE_GRAPH
+    with span("build_prompt"):
+        graph_context = get_retrieval_index(topic, knowledge_graph).build_context(
+            question, top_k=CHAT_CONTEXT_TOP_K, token_budget=CHAT_CONTEXT_TOKEN_BUDGET
+        )
+
     chat_prompt = f"""
         You are an AI assistant named Gemini. Answer the user's question based on your knowledge graph and expertise.
         Provide concise and accurate answers. If the question is unclear, ask for clarification.
 
+        **Relevant Concepts from the Knowledge Graph (concept, prerequisites, resources):**
+        {graph_context if graph_context else 'None'}
+
         **User's Question:** {question}
     """
 
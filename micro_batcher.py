@@ -0,0 +1,65 @@
+import threading
+
+
+class _Batch:
+    def __init__(self):
+        self.items = []
+        self.results = None
+        self.error = None
+        self.closed = threading.Event()  # set when the batch is full
+        self.done = threading.Event()  # set when results (or an error) are available
+
+
+class MicroBatcher:
+    """
+    Collects concurrent calls that share a key (e.g. path requests against the same
+    knowledge graph) and processes them together with process_batch(key, items), which
+    returns one result per item in order.
+
+    The first caller of a batch is its leader: it waits up to `window_seconds` (less if
+    the batch reaches `max_batch_size`), runs the batch, and hands every waiting caller
+    its own result. No background thread is involved, so it works the same under
+    threaded servers and gevent workers.
+    """
+
+    def __init__(self, process_batch, window_seconds: float = 0.05, max_batch_size: int = 8):
+        self.process_batch = process_batch
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self.open_batches = {}
+        self.lock = threading.Lock()
+
+    def submit(self, key, item):
+        """
+        Adds item to the open batch for key and blocks until the batch is processed.
+        Returns the item's result; re-raises the error if the batch failed.
+        """
+        with self.lock:
+            batch = self.open_batches.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                self.open_batches[key] = batch
+            index = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_batch_size:
+                # Later callers start a new batch
+                del self.open_batches[key]
+                batch.closed.set()
+
+        if leader:
+            batch.closed.wait(self.window_seconds)
+            with self.lock:
+                if self.open_batches.get(key) is batch:
+                    del self.open_batches[key]
+            try:
+                batch.results = self.process_batch(key, batch.items)
+            except Exception as e:
+                batch.error = e
+            batch.done.set()
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
@@ -0,0 +1,139 @@
+DEFAULT_GOAL_WEIGHT = 1.0
+
+
+def parse_goals(data: dict) -> list:
+    """
+    Reads the goals of a /generate_path request: "goals" as a list of goal strings or
+    {"goal": ..., "weight": ...} objects, else the single "goal" string.
+    Returns [(goal, weight)] with repeated goals merged, highest weight first (ties keep
+    request order). Raises ValueError for malformed goals.
+    """
+    raw_goals = data.get('goals')
+    if raw_goals is None:
+        goal = str(data.get('goal', '')).strip()
+        return [(goal, DEFAULT_GOAL_WEIGHT)] if goal else []
+    if not isinstance(raw_goals, list):
+        raise ValueError("goals must be a list.")
+
+    weights = {}
+    for item in raw_goals:
+        if isinstance(item, dict):
+            goal, weight = item.get('goal', ''), item.get('weight', DEFAULT_GOAL_WEIGHT)
+        else:
+            goal, weight = item, DEFAULT_GOAL_WEIGHT
+        if not isinstance(goal, str) or not goal.strip():
+            raise ValueError("Each goal must be a non-empty string.")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+            raise ValueError(f"Weight of goal '{goal}' must be a positive number.")
+        goal = goal.strip()
+        weights[goal] = weights.get(goal, 0) + weight
+    return sorted(weights.items(), key=lambda item: -item[1])
+
+
+def describe_goals(goals: list) -> str:
+    """
+    Formats parsed goals for a prompt, e.g. "NLP (weight 2), Computer Vision (weight 1)".
+    A single goal is returned as is.
+    """
+    if len(goals) == 1:
+        return goals[0][0]
+    return ", ".join(f"{goal} (weight {weight:g})" for goal, weight in goals)
+
+
+def plan_learning_path(goal_concepts: list, known_concepts: set, struggling_concepts, knowledge_graph: dict) -> list:
+    """
+    Orders the unknown concepts needed for every goal so that prerequisites come first.
+    All goals share one traversal: each common prerequisite is visited once. Struggling
+    concepts (and their prerequisites) come first, then goals in the given order, so
+    higher-weight goals are reached earlier.
+    """
+    path = []
+    visited = set()
+
+    for root in list(struggling_concepts) + list(goal_concepts):
+        if root in visited or root in known_concepts:
+            continue
+        # Iterative post-order DFS, so deep prerequisite chains cannot hit the recursion limit
+        visited.add(root)
+        stack = [(root, iter(knowledge_graph.get(root, {}).get("prerequisites", [])))]
+        while stack:
+            concept, prerequisites = stack[-1]
+            for prereq in prerequisites:
+                if prereq not in visited and prereq not in known_concepts:
+                    visited.add(prereq)
+                    stack.append((prereq, iter(knowledge_graph.get(prereq, {}).get("prerequisites", []))))
+                    break
+            else:
+                stack.pop()
+                path.append(concept)
+    return path
+
+
+def repair_learning_path(path: list, known_concepts: set, knowledge_graph: dict) -> tuple:
+    """
+    Checks a generated path against the knowledge graph and repairs it. Concepts that
+    are unknown to the graph, already known or repeated are dropped. Unmet prerequisites
+    the path is missing are inserted, and every prerequisite is placed before the first
+    concept that needs it. Otherwise the path keeps its order, so a valid path is
+    returned unchanged.
+
+    Returns (repaired_path, report). The report lists inserted_prerequisites, reordered
+    concepts (pulled earlier for a concept that needs them), dropped concepts and
+    whether the path was valid as given.
+    """
+    dropped = {"unknown": [], "known": [], "duplicate": []}
+    requested = []
+    seen = set()
+    for concept in path:
+        if not isinstance(concept, str) or concept not in knowledge_graph:
+            dropped["unknown"].append(concept)
+        elif concept in known_concepts:
+            dropped["known"].append(concept)
+        elif concept in seen:
+            dropped["duplicate"].append(concept)
+        else:
+            seen.add(concept)
+            requested.append(concept)
+
+    # Prerequisites are visited in the order the path asked for them, the rest in graph order
+    rank = {concept: i for i, concept in enumerate(requested)}
+
+    def unmet_prerequisites(concept):
+        prerequisites = [p for p in knowledge_graph[concept].get('prerequisites', [])
+                         if p in knowledge_graph and p not in known_concepts]
+        return iter(sorted(prerequisites, key=lambda p: rank.get(p, len(rank))))
+
+    repaired = []
+    inserted = []
+    reordered = []
+    placed = set()
+    for root in requested:
+        if root in placed:
+            continue
+        # Iterative post-order DFS; concepts already on the stack are skipped, which also breaks cycles
+        stack = [(root, unmet_prerequisites(root))]
+        on_stack = {root}
+        while stack:
+            concept, prerequisites = stack[-1]
+            for prereq in prerequisites:
+                if prereq not in placed and prereq not in on_stack:
+                    on_stack.add(prereq)
+                    stack.append((prereq, unmet_prerequisites(prereq)))
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(concept)
+                placed.add(concept)
+                repaired.append(concept)
+                if concept not in rank:
+                    inserted.append(concept)
+                elif concept != root:
+                    reordered.append(concept)
+
+    report = {
+        "inserted_prerequisites": inserted,
+        "reordered": reordered,
+        "dropped": dropped,
+        "valid": not (inserted or reordered or any(dropped.values())),
+    }
+    return repaired, report
@@ -0,0 +1,172 @@
+import atexit
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+STATE_KNOWN = "known"
+STATE_STRUGGLING = "struggling"
+VALID_STATES = (STATE_KNOWN, STATE_STRUGGLING)
+
+# Pending writes are flushed at least this often, or as soon as this many have piled up
+FLUSH_INTERVAL_SECONDS = 2.0
+MAX_PENDING_WRITES = 500
+
+# Learners whose progress is kept in memory (least recently used are evicted), and how
+# long a cached learner is trusted before it is re-read, e.g. to see other workers' writes
+MAX_CACHED_LEARNERS = 10000
+CACHE_TTL_SECONDS = 60.0
+
+
+class ProgressStore:
+    """
+    Learner progress (known and struggling concepts) per learner and graph, persisted
+    in SQLite. Reads are served from a bounded LRU cache, re-read after CACHE_TTL_SECONDS;
+    updates apply to memory immediately and are written behind in batches by a
+    background thread, so marking a concept is a cheap delta instead of a database
+    round trip. Unflushed updates are re-applied whenever a learner is re-read.
+    A concept has at most one state: marking it struggling clears "known" and vice versa.
+    """
+
+    def __init__(self, db_path: str, flush_interval: float = FLUSH_INTERVAL_SECONDS,
+                 max_cached_learners: int = MAX_CACHED_LEARNERS, cache_ttl: float = CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_cached_learners = max_cached_learners
+        self.cache_ttl = cache_ttl
+        self.lock = threading.Lock()
+        self.flush_requested = threading.Event()
+        self.states = OrderedDict()  # (learner_id, graph_key) -> (loaded_at, {concept: state}), oldest first
+        self.pending = {}  # (learner_id, graph_key, concept) -> state, or None to delete
+        self.pending_resets = set()  # (learner_id, graph_key) cleared since the last flush
+        self.flushing = ({}, set())  # the (pending, resets) being written by a flush in progress
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS progress (
+                    learner_id TEXT NOT NULL,
+                    graph_key TEXT NOT NULL,
+                    concept TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (learner_id, graph_key, concept)
+                )
+            """)
+
+        self.flusher = threading.Thread(target=self._flush_loop, name="progress-flusher", daemon=True)
+        self.flusher.start()
+        atexit.register(self.flush)
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _load(self, learner_id: str, graph_key: str) -> dict:
+        # Caller holds self.lock
+        key = (learner_id, graph_key)
+        cached = self.states.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self.states.move_to_end(key)
+            return cached[1]
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT concept, state FROM progress WHERE learner_id = ? AND graph_key = ?", key
+            ).fetchall()
+        concepts = dict(rows)
+        # Writes not in the database yet: those of a flush in progress, then newer ones
+        for pending, resets in (self.flushing, (self.pending, self.pending_resets)):
+            if key in resets:
+                concepts.clear()
+            for (pending_learner, pending_graph, concept), state in pending.items():
+                if (pending_learner, pending_graph) != key:
+                    continue
+                if state is None:
+                    concepts.pop(concept, None)
+                else:
+                    concepts[concept] = state
+        self._cache(key, concepts)
+        return concepts
+
+    def _cache(self, key: tuple, concepts: dict):
+        # Caller holds self.lock. Evicting is safe: pending writes are kept apart and re-applied on load
+        self.states[key] = (time.monotonic(), concepts)
+        self.states.move_to_end(key)
+        while len(self.states) > self.max_cached_learners:
+            self.states.popitem(last=False)
+
+    def get(self, learner_id: str, graph_key: str) -> tuple:
+        """
+        Returns (known_concepts, struggling_concepts) as sets.
+        """
+        with self.lock:
+            concepts = self._load(learner_id, graph_key)
+            known = {c for c, state in concepts.items() if state == STATE_KNOWN}
+            struggling = {c for c, state in concepts.items() if state == STATE_STRUGGLING}
+        return known, struggling
+
+    def mark(self, learner_id: str, graph_key: str, concept: str, state) -> tuple:
+        """
+        Sets a concept's state ("known", "struggling", or None to clear it) and
+        returns the learner's updated (known_concepts, struggling_concepts).
+        """
+        with self.lock:
+            concepts = self._load(learner_id, graph_key)
+            if state is None:
+                concepts.pop(concept, None)
+            else:
+                concepts[concept] = state
+            self.pending[(learner_id, graph_key, concept)] = state
+            if len(self.pending) >= MAX_PENDING_WRITES:
+                self.flush_requested.set()
+        return self.get(learner_id, graph_key)
+
+    def reset(self, learner_id: str, graph_key: str):
+        """
+        Clears all progress of a learner on a graph.
+        """
+        with self.lock:
+            self._cache((learner_id, graph_key), {})
+            self.pending = {k: v for k, v in self.pending.items() if k[:2] != (learner_id, graph_key)}
+            self.pending_resets.add((learner_id, graph_key))
+
+    def flush(self):
+        """
+        Writes all pending updates to the database in one transaction.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            resets, self.pending_resets = self.pending_resets, set()
+            if not pending and not resets:
+                return
+            self.flushing = (pending, resets)
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM progress WHERE learner_id = ? AND graph_key = ?", list(resets))
+                conn.executemany(
+                    "DELETE FROM progress WHERE learner_id = ? AND graph_key = ? AND concept = ?",
+                    [key for key, state in pending.items() if state is None],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO progress (learner_id, graph_key, concept, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    [key + (state, now) for key, state in pending.items() if state is not None],
+                )
+        except sqlite3.Error as e:
+            print(f"Failed to flush learner progress, will retry: {e}")
+            with self.lock:
+                # Newer updates made during the failed flush take precedence, and
+                # learners reset meanwhile must not get their old updates back
+                restored = {k: v for k, v in pending.items() if k[:2] not in self.pending_resets}
+                self.pending = {**restored, **self.pending}
+                self.pending_resets |= resets
+                self.flushing = ({}, set())
+        else:
+            with self.lock:
+                self.flushing = ({}, set())
+
+    def _flush_loop(self):
+        while True:
+            self.flush_requested.wait(self.flush_interval)
+            self.flush_requested.clear()
+            self.flush()
@@ -0,0 +1,151 @@
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+from kg_ingest import PLACEHOLDER_RESOURCE_URL
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Metadata fields that may be updated on a registered resource, with their accepted types.
+# url, type and title identify a resource (see resource_key) and cannot be changed.
+UPDATABLE_FIELDS = {
+    "verified": (bool,),
+    "description": (str,),
+}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a resource URL for deduplication: lowercase scheme and host, no default
+    port, no fragment and no trailing slash. Unparseable values are only stripped.
+    """
+    url = str(url).strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    if port and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    path = parts.path.rstrip("/")
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+def resource_key(resource: dict) -> tuple:
+    """
+    Identity of a resource in the registry: its normalized URL. Placeholder and
+    URL-less resources only stand for their title, so those are keyed by type and title too.
+    """
+    url = resource.get('url')
+    if not url or url == PLACEHOLDER_RESOURCE_URL:
+        return (url, resource.get('type'), resource.get('title'))
+    return (normalize_url(url),)
+
+
+class ResourceRegistry:
+    """
+    Process-wide table of learning resources, interned by normalized URL. Every graph
+    refers to the registry's single dict per resource, so a popular URL is held once
+    however many concepts and topics list it, and metadata updates (e.g. marking a
+    resource verified) are seen everywhere. Each resource has a compact integer ID.
+    """
+
+    def __init__(self):
+        self.resources = []  # resource ID -> resource dict
+        self.ids_by_key = {}
+        self.ids_by_object = {}  # id() of an interned dict -> resource ID
+        self.lock = threading.Lock()
+
+    def intern(self, resource: dict) -> dict:
+        """
+        Returns the registry's dict for a resource, registering the resource on first sight.
+        """
+        with self.lock:
+            return self.resources[self._intern(resource)]
+
+    def _intern(self, resource: dict) -> int:
+        # Caller holds self.lock
+        resource_id = self.ids_by_object.get(id(resource))
+        if resource_id is not None:
+            return resource_id
+        key = resource_key(resource)
+        resource_id = self.ids_by_key.get(key)
+        if resource_id is None:
+            resource_id = len(self.resources)
+            self.resources.append(resource)
+            self.ids_by_key[key] = resource_id
+            self.ids_by_object[id(resource)] = resource_id
+        return resource_id
+
+    def intern_graph(self, knowledge_graph: dict) -> dict:
+        """
+        Rebinds every concept's resources to interned dicts, dropping duplicates within
+        a concept. Modifies and returns the graph.
+        """
+        with self.lock:
+            for data in knowledge_graph.values():
+                resources = data.get('resources')
+                if not resources:
+                    continue
+                interned = []
+                seen = set()
+                for resource in resources:
+                    if not isinstance(resource, dict):
+                        continue
+                    resource_id = self._intern(resource)
+                    if resource_id not in seen:
+                        seen.add(resource_id)
+                        interned.append(self.resources[resource_id])
+                resources[:] = interned
+        return knowledge_graph
+
+    def id_of(self, resource: dict) -> int:
+        with self.lock:
+            return self._intern(resource)
+
+    def get(self, resource_id: int):
+        """
+        Returns the resource dict for an ID, or None.
+        """
+        with self.lock:
+            if 0 <= resource_id < len(self.resources):
+                return self.resources[resource_id]
+            return None
+
+    def update(self, resource_id: int, fields: dict):
+        """
+        Updates a resource's metadata (UPDATABLE_FIELDS) in place, for every graph that
+        lists it. Returns the updated resource, or None for an unknown ID. Raises
+        ValueError for any other field or a value of the wrong type.
+        """
+        for field, value in fields.items():
+            if field not in UPDATABLE_FIELDS:
+                raise ValueError(f"Field '{field}' cannot be updated; allowed fields: {', '.join(UPDATABLE_FIELDS)}.")
+            if not isinstance(value, UPDATABLE_FIELDS[field]):
+                raise ValueError(f"Field '{field}' has a value of the wrong type.")
+        with self.lock:
+            if not 0 <= resource_id < len(self.resources):
+                return None
+            self.resources[resource_id].update(fields)
+            return self.resources[resource_id]
+
+    def compact(self, knowledge_graph: dict) -> tuple:
+        """
+        Returns (graph, resources) where each concept lists "resource_ids" instead of
+        resources, and resources maps each referenced ID to its resource once.
+        """
+        graph = {}
+        table = {}
+        with self.lock:
+            for name, data in knowledge_graph.items():
+                resource_ids = [self._intern(r) for r in data.get('resources', []) if isinstance(r, dict)]
+                graph[name] = {**{k: v for k, v in data.items() if k != 'resources'}, "resource_ids": resource_ids}
+                for resource_id in resource_ids:
+                    table[resource_id] = self.resources[resource_id]
+        return graph, table
+
+    def __len__(self) -> int:
+        return len(self.resources)
@@ -0,0 +1,79 @@
+import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+
+from tracing import span
+
+# Upper bound on pooled keep-alive connections to the Gemini API per process. Under the gevent
+# worker a single process holds many in-flight requests, so this must be well above the thread count.
+GEMINI_POOL_SIZE = int(os.environ.get("GEMINI_POOL_SIZE", "200"))
+
+
+class TracedHTTPSConnection(HTTPSConnection):
+    """
+    HTTPS connection that records TCP + TLS setup as a span of the current trace.
+    Reused pooled connections never call connect(), so traces only show it when
+    a request had to open a new connection.
+    """
+
+    def connect(self):
+        with span("gemini.connect", host=self.host):
+            super().connect()
+
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracedHTTPSConnection
+
+
+class TracedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # The pool manager shares urllib3's module-level mapping, so replace it rather than mutate it
+        self.poolmanager.pool_classes_by_scheme = {
+            **self.poolmanager.pool_classes_by_scheme,
+            "https": TracedHTTPSConnectionPool,
+        }
+
+
+def create_gemini_session() -> requests.Session:
+    """
+    Creates a requests session that reuses TLS connections to the Gemini API
+    instead of opening a new one for every call.
+    """
+    session = requests.Session()
+    adapter = TracedHTTPAdapter(pool_connections=4, pool_maxsize=GEMINI_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+
+# Shared by every route of the process
+gemini_session = create_gemini_session()
+
+
+def _gevent_threadpool():
+    """
+    Returns gevent's native thread pool when the process runs under a monkey-patched
+    gevent worker, else None.
+    """
+    try:
+        from gevent import monkey, get_hub
+    except ImportError:
+        return None
+    if not monkey.is_module_patched("threading"):
+        return None
+    return get_hub().threadpool
+
+
+def run_cpu_bound(func, *args, **kwargs):
+    """
+    Runs CPU-bound work (e.g. path computation) without stalling the event loop.
+    Under the gevent worker the call runs on a native thread while other greenlets
+    keep serving I/O; under threaded servers it simply runs inline.
+    """
+    threadpool = _gevent_threadpool()
+    if threadpool is None:
+        return func(*args, **kwargs)
+    return threadpool.spawn(func, *args, **kwargs).get()
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Speculator:
+    """
+    Runs speculative work (e.g. precomputing the path a learner will most likely ask
+    for next) on a small dedicated pool, so it never takes workers from foreground
+    requests. Speculation is bounded and best effort:
+    - at most `max_pending` tasks are queued or running; further ones are dropped,
+    - tasks are skipped while `max_foreground` or more foreground calls are in flight,
+    - upstream (LLM) calls made by tasks are limited to `calls_per_minute` through acquire_quota(),
+    - cancel(owner) drops an owner's queued tasks and flags its running ones, e.g. when
+      the learner acts again and the speculated state is no longer the likely next one.
+    Tasks are called as func(cancelled, *args), where cancelled is a threading.Event to
+    check before doing expensive work.
+    """
+
+    def __init__(self, max_workers: int = 1, max_pending: int = 4, max_foreground: int = 8, calls_per_minute: int = 30):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculation")
+        self.max_pending = max_pending
+        self.max_foreground = max_foreground
+        self.calls_per_minute = calls_per_minute
+        self.lock = threading.Lock()
+        self.pending = {}  # task key -> (owner, future, cancelled event)
+        self.foreground_active = 0
+        self.tokens = float(calls_per_minute)
+        self.tokens_updated = time.monotonic()
+
+    def speculate(self, owner, task_key, func, *args) -> bool:
+        """
+        Schedules func(cancelled, *args) unless the same task is already pending or the
+        speculation budget is used up. Returns whether the task was scheduled.
+        """
+        with self.lock:
+            if task_key in self.pending or len(self.pending) >= self.max_pending:
+                return False
+            if self.foreground_active >= self.max_foreground:
+                return False
+            cancelled = threading.Event()
+            future = self.executor.submit(self._run, task_key, cancelled, func, args)
+            self.pending[task_key] = (owner, future, cancelled)
+            return True
+
+    def cancel(self, owner) -> int:
+        """
+        Cancels every queued or running task of an owner. Returns how many were cancelled.
+        """
+        with self.lock:
+            tasks = [(key, future, cancelled) for key, (task_owner, future, cancelled) in self.pending.items() if task_owner == owner]
+            for key, future, cancelled in tasks:
+                cancelled.set()
+                if future.cancel():
+                    del self.pending[key]
+        return len(tasks)
+
+    def acquire_quota(self) -> bool:
+        """
+        Takes one upstream call from the per-minute budget (token bucket). Returns False when it is exhausted.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.calls_per_minute, self.tokens + (now - self.tokens_updated) * self.calls_per_minute / 60.0)
+            self.tokens_updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def foreground(self):
+        """
+        Context manager marking a foreground call in flight; speculation backs off while many are.
+        """
+        return _ForegroundCall(self)
+
+    def _run(self, task_key, cancelled, func, args):
+        try:
+            busy = self.foreground_active >= self.max_foreground
+            if not cancelled.is_set() and not busy:
+                func(cancelled, *args)
+        except Exception as e:
+            print(f"Speculative task {task_key} failed: {e}")
+        finally:
+            with self.lock:
+                self.pending.pop(task_key, None)
+
+
+class _ForegroundCall:
+    __slots__ = ("speculator",)
+
+    def __init__(self, speculator: Speculator):
+        self.speculator = speculator
+
+    def __enter__(self):
+        with self.speculator.lock:
+            self.speculator.foreground_active += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self.speculator.lock:
+            self.speculator.foreground_active -= 1
+        return False
@@ -0,0 +1,323 @@
+// The knowledge graph is served by the backend (/knowledge_graph) so it always matches
+// the graph used for path generation
+let KNOWLEDGE_GRAPH = {};
+let graphVersion = null; // Version of KNOWLEDGE_GRAPH; path requests are pinned to it
+
+// State variables (simulating React's useState)
+let goal = '';
+let userKnownConcepts = new Set();
+let userStrugglingConcepts = new Set();
+let learningPath = [];
+let loading = false;
+
+// DOM Elements
+const goalInput = document.getElementById('goalInput');
+const generatePathBtn = document.getElementById('generatePathBtn');
+const messageDisplay = document.getElementById('messageDisplay');
+const errorDisplay = document.getElementById('errorDisplay');
+const loadingIndicator = document.getElementById('loadingIndicator');
+const learningPathSection = document.getElementById('learningPathSection');
+const learningPathList = document.getElementById('learningPathList');
+const knownConceptsList = document.getElementById('knownConceptsList');
+const strugglingConceptsList = document.getElementById('strugglingConceptsList');
+const resetAllBtn = document.getElementById('resetAllBtn');
+
+// --- UI Update Functions ---
+function updateUI() {
+    // Update goal input
+    goalInput.value = goal;
+
+    // Update loading state
+    if (loading) {
+        loadingIndicator.classList.remove('hidden');
+        generatePathBtn.disabled = true;
+        goalInput.disabled = true;
+        resetAllBtn.disabled = true;
+    } else {
+        loadingIndicator.classList.add('hidden');
+        generatePathBtn.disabled = !goal; // Enable only if goal is not empty
+        goalInput.disabled = false;
+        resetAllBtn.disabled = false;
+    }
+
+    // Clear messages and errors when new action starts
+    if (loading) {
+        messageDisplay.innerHTML = '';
+        errorDisplay.innerHTML = '';
+    }
+
+    // Render learning path
+    learningPathList.innerHTML = '';
+    if (learningPath.length > 0) {
+        learningPathSection.classList.remove('hidden');
+
+        // Find the last concept in the path (the "search content")
+        const searchConcept = learningPath[learningPath.length - 1];
+        // Check if all prerequisites for the search concept are in userKnownConcepts
+        const prereqs = KNOWLEDGE_GRAPH[searchConcept]?.prerequisites || [];
+        const allPrereqsComplete = prereqs.every(pr => userKnownConcepts.has(pr));
+
+        // If all prerequisites are complete, show congratulations message
+        if (allPrereqsComplete && learningPath.length > 1) {
+            messageDisplay.innerHTML = `
+                <div class="p-3 bg-blue-100 border border-blue-300 text-blue-800 rounded-lg flex items-center mb-4">
+                    <svg class="w-5 h-5 mr-2" fill="currentColor" viewBox="0 0 20 20">
+                        <path fill-rule="evenodd" d="M10 18a8 8 0 100-16 8 8 0 000 16zm3.707-9.293a1 1 0 00-1.414-1.414L9 10.586 7.707 9.293a1 1 0 00-1.414 1.414l2 2a1 1 0 001.414 0l4-4z" clip-rule="evenodd"></path>
+                    </svg>
+                    Congratulations! All prerequisites for <b>${searchConcept}</b> are complete. You can now access its resources.
+                </div>
+            `;
+        }
+
+        learningPath.forEach((concept, index) => {
+            const listItem = document.createElement('li');
+            listItem.className = 'bg-white p-5 rounded-lg shadow-md border border-gray-200 hover:shadow-xl transition-shadow duration-300';
+
+            // For the search concept, gray out links unless all prereqs are complete
+            let resourcesHtml = '';
+            if (KNOWLEDGE_GRAPH[concept]?.resources.length > 0) {
+                resourcesHtml = `<ul class="list-disc list-inside text-gray-600 space-y-1 mt-2">` +
+                    KNOWLEDGE_GRAPH[concept].resources.map(res => {
+                        // If this is the search concept and prereqs are NOT complete, gray out
+                        if (concept === searchConcept && !allPrereqsComplete) {
+                            return `<li>
+                                <span class="text-gray-400 cursor-not-allowed" title="Complete all prerequisites to unlock this resource.">
+                                    ${res.title} (${res.type})
+                                </span>
+                            </li>`;
+                        } else {
+                            return `<li>
+                                <a href="${res.url}" target="_blank" rel="noopener noreferrer" class="text-blue-600 hover:underline">
+                                    ${res.title} (${res.type})
+                                </a>
+                            </li>`;
+                        }
+                    }).join('') +
+                    `</ul>`;
+            } else {
+                resourcesHtml = `<p class="text-gray-500 italic mt-2">No specific resources listed for this concept.</p>`;
+            }
+
+            listItem.innerHTML = `
+                <div class="flex items-center mb-3">
+                    <span class="flex-shrink-0 w-8 h-8 flex items-center justify-center bg-purple-500 text-white rounded-full font-bold text-sm mr-4">
+                        ${index + 1}
+                    </span>
+                    <h3 class="text-xl font-semibold text-purple-700">${concept}</h3>
+                </div>
+                <div class="pl-12">
+                    ${resourcesHtml}
+                    <div class="mt-4 flex flex-wrap gap-2">
+                        <button data-concept="${concept}" class="complete-btn px-4 py-2 bg-green-500 text-white rounded-lg text-sm font-medium hover:bg-green-600 transition-colors duration-200 shadow-sm">
+                            Mark as Complete
+                        </button>
+                        <button data-concept="${concept}" class="struggle-btn px-4 py-2 bg-yellow-500 text-white rounded-lg text-sm font-medium hover:bg-yellow-600 transition-colors duration-200 shadow-sm">
+                            Mark as Struggling
+                        </button>
+                    </div>
+                </div>
+            `;
+            learningPathList.appendChild(listItem);
+        });
+
+        // Attach event listeners to new buttons
+        document.querySelectorAll('.complete-btn').forEach(button => {
+            button.onclick = (event) => handleCompleteConcept(event.target.dataset.concept);
+        });
+        document.querySelectorAll('.struggle-btn').forEach(button => {
+            button.onclick = (event) => handleStrugglingConcept(event.target.dataset.concept);
+        });
+
+    } else {
+        learningPathSection.classList.add('hidden');
+    }
+
+    // Render known concepts
+    knownConceptsList.innerHTML = '';
+    if (userKnownConcepts.size > 0) {
+        userKnownConcepts.forEach(concept => {
+            const li = document.createElement('li');
+            li.textContent = concept;
+            knownConceptsList.appendChild(li);
+        });
+    } else {
+        knownConceptsList.innerHTML = '<li class="italic text-gray-500">No concepts marked as known yet.</li>';
+    }
+
+    // Render struggling concepts
+    strugglingConceptsList.innerHTML = '';
+    if (userStrugglingConcepts.size > 0) {
+        userStrugglingConcepts.forEach(concept => {
+            const li = document.createElement('li');
+            li.textContent = concept;
+            strugglingConceptsList.appendChild(li);
+        });
+    } else {
+        strugglingConceptsList.innerHTML = '<li class="italic text-gray-500">No concepts marked as struggling yet.</li>';
+    }
+}
+
+// --- Knowledge Graph Loading ---
+async function loadKnowledgeGraph() {
+    // The endpoint answers with an ETag, so repeat loads are cheap 304 revalidations
+    const response = await fetch('http://127.0.0.1:5000/knowledge_graph');
+    if (!response.ok) {
+        throw new Error(`Backend error: ${response.status}`);
+    }
+    KNOWLEDGE_GRAPH = await response.json();
+    graphVersion = response.headers.get('X-Graph-Version');
+}
+
+// --- LLM Interaction Function ---
+async function generateLearningPath() {
+    loading = true;
+    updateUI();
+    errorDisplay.innerHTML = ''; // Clear previous errors
+    messageDisplay.innerHTML = ''; // Clear previous messages
+
+    // Data to send to Flask backend
+    const requestData = {
+        goal: goal,
+        known_concepts: Array.from(userKnownConcepts),
+        struggling_concepts: Array.from(userStrugglingConcepts),
+        graph_version: graphVersion // Plan against the graph on screen even if it was regenerated since
+    };
+
+    try {
+        // Send request to your Flask backend
+        const response = await fetch('http://127.0.0.1:5000/generate_path', { // Flask server URL
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(requestData)
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(`Backend error: ${response.status} - ${errorData.error || JSON.stringify(errorData)}`);
+        }
+
+        const result = await response.json();
+        console.log("Backend result:", result); // Debug
+
+        // Pick up the graph the path was built from if it differs from ours (e.g. our version expired)
+        if (String(result.graph_version) !== String(graphVersion)) {
+            await loadKnowledgeGraph();
+        }
+
+        let rawPath = result.path || [];
+        // Remove concepts already marked as known, except the last one (search concept)
+        if (rawPath.length > 1) {
+            rawPath = rawPath.filter((concept, idx) => {
+                // Always keep the last concept (search concept)
+                if (idx === rawPath.length - 1) return true;
+                return !userKnownConcepts.has(concept);
+            });
+        }
+        learningPath = rawPath;
+        userKnownConcepts = new Set(result.known_concepts || []);
+        userStrugglingConcepts = new Set(result.struggling_concepts || []);
+        displayMessage('Learning path generated successfully!');
+
+    } catch (err) {
+        console.error("Error generating learning path:", err);
+        displayError(`Failed to generate path: ${err.message}. Ensure the Python Flask server is running.`);
+    } finally {
+        loading = false;
+        updateUI();
+    }
+}
+
+// --- Goal Autocomplete ---
+const goalSuggestions = document.getElementById('goalSuggestions');
+let suggestTimer = null;
+
+// Fills the goal input's datalist with matching concept names, shortly after the user stops typing
+function suggestGoalConcepts(query) {
+    clearTimeout(suggestTimer);
+    if (!query.trim()) {
+        goalSuggestions.innerHTML = '';
+        return;
+    }
+    suggestTimer = setTimeout(async () => {
+        try {
+            const params = new URLSearchParams(graphVersion ? { q: query, version: graphVersion } : { q: query });
+            const response = await fetch(`http://127.0.0.1:5000/concepts/suggest?${params}`);
+            if (!response.ok) return;
+            const result = await response.json();
+            goalSuggestions.innerHTML = '';
+            result.suggestions.forEach(concept => {
+                const option = document.createElement('option');
+                option.value = concept;
+                goalSuggestions.appendChild(option);
+            });
+        } catch (err) {
+            console.error('Error fetching goal suggestions:', err);
+        }
+    }, 150);
+}
+
+// --- Event Handlers ---
+goalInput.addEventListener('input', (e) => {
+    goal = e.target.value;
+    suggestGoalConcepts(goal);
+    updateUI(); // Update button state
+});
+
+generatePathBtn.addEventListener('click', generateLearningPath);
+
+resetAllBtn.addEventListener('click', () => {
+    goal = '';
+    userKnownConcepts = new Set();
+    userStrugglingConcepts = new Set();
+    learningPath = [];
+    displayMessage('Knowledge state reset.');
+    updateUI();
+    learningPathSection.classList.add('hidden'); // Hide path section on reset
+});
+
+function handleCompleteConcept(concept) {
+    userKnownConcepts.add(concept);
+    userStrugglingConcepts.delete(concept); // Remove from struggling if completed
+    displayMessage(`"${concept}" marked as complete! Regenerating path...`);
+    // Regenerate path after user interaction
+    setTimeout(generateLearningPath, 500); // Small delay for message visibility
+}
+
+function handleStrugglingConcept(concept) {
+    userStrugglingConcepts.add(concept);
+    displayMessage(`"${concept}" marked as struggling. Regenerating path for review...`);
+    // Regenerate path after user interaction
+    setTimeout(generateLearningPath, 500); // Small delay for message visibility
+}
+
+// --- Message Display Helpers ---
+function displayMessage(msg) {
+    messageDisplay.innerHTML = `
+        <div class="p-3 bg-green-100 border border-green-300 text-green-800 rounded-lg flex items-center">
+            <svg class="w-5 h-5 mr-2" fill="currentColor" viewBox="0 0 20 20">
+                <path fill-rule="evenodd" d="M10 18a8 8 0 100-16 8 8 0 000 16zm3.707-9.293a1 1 0 00-1.414-1.414L9 10.586 7.707 9.293a1 1 0 00-1.414 1.414l2 2a1 1 0 001.414 0l4-4z" clip-rule="evenodd"></path>
+            </svg>
+            ${msg}
+        </div>
+    `;
+}
+
+function displayError(msg) {
+    errorDisplay.innerHTML = `
+        <div class="p-3 bg-red-100 border border-red-300 text-red-800 rounded-lg flex items-center">
+            <svg class="w-5 h-5 mr-2" fill="currentColor" viewBox="0 0 20 20">
+                <path fill-rule="evenodd" d="M10 18a8 8 0 100-16 8 8 0 000 16zM8.707 7.293a1 1 0 00-1.414 1.414L8.586 10l-1.293 1.293a1 1 0 101.414 1.414L10 11.414l1.293 1.293a1 1 0 001.414-1.414L11.414 10l1.293-1.293a1 1 0 00-1.414-1.414L10 8.586 8.707 7.293z" clip-rule="evenodd"></path>
+            </svg>
+            ${msg}
+        </div>
+    `;
+}
+
+// Initial UI render
+updateUI();
+loadKnowledgeGraph()
+    .then(updateUI)
+    .catch(err => {
+        console.error("Error loading knowledge graph:", err);
+        displayError(`Failed to load knowledge graph: ${err.message}. Ensure the Python Flask server is running.`);
+    });
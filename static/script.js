@@ -1,5 +1,11 @@
 // KNOWLEDGE_GRAPH will now be dynamically loaded from the backend
-let KNOWLEDGE_GRAPH = {}; // Initialize as empty
+let KNOWLEDGE_GRAPH = {}; // Initialize as empty (concepts and prerequisites only)
+let activeTopic = ''; // Topic of the loaded KNOWLEDGE_GRAPH, used to query the server for it
+let conceptResources = {}; // Resources fetched on demand, keyed by concept
+
+// Learner progress is stored on the server under this ID, so it survives reloads
+const learnerId = localStorage.getItem('learnerId') || (crypto.randomUUID ? crypto.randomUUID() : String(Date.now()) + Math.random().toString(16).slice(2));
+localStorage.setItem('learnerId', learnerId);
 
 // State variables
 let kgTopic = '';
@@ -10,6 +16,7 @@ let kgError = '';
 let goal = '';
 let userKnownConcepts = new Set();
 let userStrugglingConcepts = new Set();
+let readyConcepts = []; // Concepts whose prerequisites are all known, maintained by the server
 let learningPath = [];
 let isPathLoading = false; // Renamed from 'loading' for clarity
 
@@ -29,6 +36,7 @@ const learningPathSection = document.getElementById('learningPathSection');
 const learningPathList = document.getElementById('learningPathList');
 const knownConceptsList = document.getElementById('knownConceptsList');
 const strugglingConceptsList = document.getElementById('strugglingConceptsList');
+const readyConceptsList = document.getElementById('readyConceptsList');
 const resetAllBtn = document.getElementById('resetAllBtn');
 
 // DOM Elements for Chat Section
@@ -68,9 +76,11 @@ function updateUI() {
             const listItem = document.createElement('li');
             listItem.className = 'bg-white p-5 rounded-lg shadow-md border border-gray-200 hover:shadow-xl transition-shadow duration-300';
 
-            // Ensure concept exists in KNOWLEDGE_GRAPH before accessing its properties
-            const resources = KNOWLEDGE_GRAPH[concept] && KNOWLEDGE_GRAPH[concept].resources ? KNOWLEDGE_GRAPH[concept].resources : [];
-            const resourcesHtml = resources.length > 0
+            // Resources are loaded only once the user expands a concept
+            const resources = getConceptResources(concept);
+            const resourcesHtml = resources === undefined
+                ? `<button data-concept="${concept}" class="resources-btn mt-2 text-blue-600 hover:underline text-sm">Show resources</button>`
+                : resources.length > 0
                 ? `<ul class="list-disc list-inside text-gray-600 space-y-1 mt-2">
                     ${resources.map(res => `
                         <li>
@@ -111,6 +121,9 @@ function updateUI() {
         document.querySelectorAll('.struggle-btn').forEach(button => {
             button.onclick = (event) => handleStrugglingConcept(event.target.dataset.concept);
         });
+        document.querySelectorAll('.resources-btn').forEach(button => {
+            button.onclick = (event) => loadConceptResources(event.target.dataset.concept);
+        });
 
     } else {
         learningPathSection.classList.add('hidden');
@@ -139,6 +152,18 @@ function updateUI() {
     } else {
         strugglingConceptsList.innerHTML = '<li class="italic text-gray-500">No concepts marked as struggling yet.</li>';
     }
+
+    // Render the concepts that are ready to learn next
+    readyConceptsList.innerHTML = '';
+    if (readyConcepts.length > 0) {
+        readyConcepts.forEach(concept => {
+            const li = document.createElement('li');
+            li.textContent = concept;
+            readyConceptsList.appendChild(li);
+        });
+    } else {
+        readyConceptsList.innerHTML = '<li class="italic text-gray-500">Nothing ready yet.</li>';
+    }
 }
 
 // --- Knowledge Graph Generation Function ---
@@ -160,7 +185,8 @@ async function generateKnowledgeGraph() {
         const response = await fetch('http://127.0.0.1:5000/generate_knowledge_graph', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ topic: topic }),
+            // Resources are fetched per concept; generation runs as a background job
+            body: JSON.stringify({ topic: topic, include_resources: false, async: true }),
         });
 
         if (!response.ok) {
@@ -168,14 +194,23 @@ async function generateKnowledgeGraph() {
             throw new Error(`Backend error: ${response.status} - ${errorData.error || JSON.stringify(errorData)}`);
         }
 
-        const result = await response.json();
+        let result = await response.json();
+        if (response.status === 202) {
+            kgMessage = 'Generating Knowledge Graph in the background...';
+            updateUI();
+            result = await waitForJob(result);
+        }
         if (result.knowledge_graph && Object.keys(result.knowledge_graph).length > 0) {
             KNOWLEDGE_GRAPH = result.knowledge_graph;
+            activeTopic = result.canonical_topic || topic; // The server may reuse a graph cached under another name
+            conceptResources = {};
+            localStorage.setItem('activeTopic', activeTopic);
+            await loadProgress();
             kgMessage = `Knowledge Graph for "${topic}" generated successfully!`;
             console.log('Generated KNOWLEDGE_GRAPH:', KNOWLEDGE_GRAPH);
 
             // Render the knowledge graph visualization
-            renderKnowledgeGraph(KNOWLEDGE_GRAPH);
+            renderKnowledgeGraph(KNOWLEDGE_GRAPH, result.layout);
         } else {
             kgError = 'Failed to generate a valid Knowledge Graph. Please try a different topic.';
             console.error('Empty or invalid KG from backend:', result);
@@ -189,6 +224,27 @@ async function generateKnowledgeGraph() {
     }
 }
 
+// Follows a generation job over Server-Sent Events until it finishes
+function waitForJob(job) {
+    return new Promise((resolve, reject) => {
+        const events = new EventSource(`http://127.0.0.1:5000${job.events_url}?include_resources=false`);
+        events.addEventListener('status', (event) => {
+            const status = JSON.parse(event.data);
+            if (status.status === 'succeeded') {
+                events.close();
+                resolve(status);
+            } else if (status.status === 'failed') {
+                events.close();
+                reject(new Error(status.error || 'Knowledge graph generation failed.'));
+            }
+        });
+        events.onerror = () => {
+            events.close();
+            reject(new Error('Lost connection while waiting for the knowledge graph.'));
+        };
+    });
+}
+
 // --- Learning Path Generation Function ---
 async function generateLearningPath() {
     if (Object.keys(KNOWLEDGE_GRAPH).length === 0) {
@@ -203,9 +259,8 @@ async function generateLearningPath() {
 
     const requestData = {
         goal: goal,
-        known_concepts: Array.from(userKnownConcepts),
-        struggling_concepts: Array.from(userStrugglingConcepts),
-        knowledge_graph: KNOWLEDGE_GRAPH // Pass the dynamic KG to the backend
+        learner_id: learnerId, // The backend reads known/struggling concepts from its progress store
+        topic: activeTopic // The backend looks the cached KG up by topic
     };
 
     try {
@@ -233,6 +288,68 @@ async function generateLearningPath() {
     }
 }
 
+// --- Learner Progress ---
+function applyProgress(progress) {
+    userKnownConcepts = new Set(progress.known_concepts || []);
+    userStrugglingConcepts = new Set(progress.struggling_concepts || []);
+    readyConcepts = progress.ready_concepts || [];
+}
+
+async function loadProgress() {
+    const params = new URLSearchParams({ learner_id: learnerId, topic: activeTopic });
+    const response = await fetch(`http://127.0.0.1:5000/progress?${params}`);
+    if (response.ok) {
+        applyProgress(await response.json());
+    }
+}
+
+// Sends a single progress delta; state is 'known', 'struggling' or null
+async function updateProgress(concept, state) {
+    const response = await fetch('http://127.0.0.1:5000/progress', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ learner_id: learnerId, topic: activeTopic, concept: concept, state: state })
+    });
+    if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(`Backend error: ${response.status} - ${errorData.error || JSON.stringify(errorData)}`);
+    }
+    applyProgress(await response.json());
+}
+
+// --- On-demand Resource Loading ---
+function getConceptResources(concept) {
+    // Graphs that still embed their resources don't need a round trip
+    if (KNOWLEDGE_GRAPH[concept] && Array.isArray(KNOWLEDGE_GRAPH[concept].resources)) {
+        return KNOWLEDGE_GRAPH[concept].resources;
+    }
+    return conceptResources[concept];
+}
+
+async function loadConceptResources(concept) {
+    const resources = [];
+    let offset = 0;
+    try {
+        while (offset !== null) {
+            const params = new URLSearchParams({ topic: activeTopic, concept: concept, offset: offset });
+            const response = await fetch(`http://127.0.0.1:5000/knowledge_graph/resources?${params}`);
+            if (!response.ok) {
+                const errorData = await response.json();
+                throw new Error(`Backend error: ${response.status} - ${errorData.error || JSON.stringify(errorData)}`);
+            }
+            const result = await response.json();
+            resources.push(...result.resources);
+            offset = result.page.next_offset;
+        }
+        conceptResources[concept] = resources;
+    } catch (err) {
+        console.error(`Error loading resources for ${concept}:`, err);
+        displayError(`Failed to load resources for "${concept}": ${err.message}`);
+    } finally {
+        updateUI();
+    }
+}
+
 // --- Chat Interaction Function ---
 async function sendChatMessage() {
     const question = chatInput.value.trim();
@@ -246,7 +363,7 @@ async function sendChatMessage() {
         const response = await fetch('http://127.0.0.1:5000/chat', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ question }),
+            body: JSON.stringify({ question, topic: activeTopic }), // Server grounds the answer in this topic's graph
         });
 
         if (!response.ok) {
@@ -262,6 +379,35 @@ async function sendChatMessage() {
     }
 }
 
+// --- Goal Autocomplete ---
+const goalSuggestions = document.getElementById('goalSuggestions');
+let suggestTimer = null;
+
+// Fills the goal input's datalist with matching concept names, shortly after the user stops typing
+function suggestGoalConcepts(query) {
+    clearTimeout(suggestTimer);
+    if (!query.trim()) {
+        goalSuggestions.innerHTML = '';
+        return;
+    }
+    suggestTimer = setTimeout(async () => {
+        try {
+            const params = new URLSearchParams({ q: query, topic: activeTopic });
+            const response = await fetch(`http://127.0.0.1:5000/concepts/suggest?${params}`);
+            if (!response.ok) return;
+            const result = await response.json();
+            goalSuggestions.innerHTML = '';
+            result.suggestions.forEach(concept => {
+                const option = document.createElement('option');
+                option.value = concept;
+                goalSuggestions.appendChild(option);
+            });
+        } catch (err) {
+            console.error('Error fetching goal suggestions:', err);
+        }
+    }, 150);
+}
+
 // --- Event Handlers ---
 kgTopicInput.addEventListener('input', (e) => {
     kgTopic = e.target.value;
@@ -272,14 +418,23 @@ generateKgBtn.addEventListener('click', generateKnowledgeGraph);
 
 goalInput.addEventListener('input', (e) => {
     goal = e.target.value;
+    suggestGoalConcepts(goal);
     updateUI();
 });
 
 generatePathBtn.addEventListener('click', generateLearningPath);
 
 resetAllBtn.addEventListener('click', () => {
+    if (activeTopic) {
+        const params = new URLSearchParams({ learner_id: learnerId, topic: activeTopic });
+        fetch(`http://127.0.0.1:5000/progress?${params}`, { method: 'DELETE' })
+            .catch(err => console.error('Error resetting progress:', err));
+    }
+    localStorage.removeItem('activeTopic');
     kgTopic = '';
     KNOWLEDGE_GRAPH = {}; // Reset KG
+    activeTopic = '';
+    conceptResources = {};
     isKgLoading = false;
     kgMessage = '';
     kgError = '';
@@ -287,6 +442,7 @@ resetAllBtn.addEventListener('click', () => {
     goal = '';
     userKnownConcepts = new Set();
     userStrugglingConcepts = new Set();
+    readyConcepts = [];
     learningPath = [];
     isPathLoading = false;
     displayMessage('Knowledge state reset.');
@@ -296,16 +452,34 @@ resetAllBtn.addEventListener('click', () => {
 
 sendChatBtn.addEventListener('click', sendChatMessage);
 
-function handleCompleteConcept(concept) {
+async function handleCompleteConcept(concept) {
     userKnownConcepts.add(concept);
     userStrugglingConcepts.delete(concept);
-    displayMessage(`"${concept}" marked as complete! Regenerating path...`);
-    setTimeout(generateLearningPath, 500);
+    // Completing a concept does not reorder the rest of the path, so update in place instead of regenerating
+    learningPath = learningPath.filter(c => c !== concept);
+    displayMessage(`"${concept}" marked as complete!`);
+    updateUI();
+    try {
+        await updateProgress(concept, 'known'); // The response carries the updated ready-to-learn concepts
+    } catch (err) {
+        console.error('Error saving progress:', err);
+        displayError(`Failed to save progress: ${err.message}`);
+        return;
+    }
+    updateUI();
 }
 
-function handleStrugglingConcept(concept) {
+async function handleStrugglingConcept(concept) {
     userStrugglingConcepts.add(concept);
+    userKnownConcepts.delete(concept); // The server keeps a single state per concept
     displayMessage(`"${concept}" marked as struggling. Regenerating path for review...`);
+    try {
+        await updateProgress(concept, 'struggling');
+    } catch (err) {
+        console.error('Error saving progress:', err);
+        displayError(`Failed to save progress: ${err.message}`);
+        return;
+    }
     setTimeout(generateLearningPath, 500);
 }
 
@@ -332,10 +506,16 @@ function displayError(msg) {
     `;
 }
 
-function renderKnowledgeGraph(knowledgeGraph) {
+function renderKnowledgeGraph(knowledgeGraph, layout) {
     const container = document.getElementById('knowledgeGraphContainer');
     container.innerHTML = ''; // Clear previous graph
 
+    // Use the layout precomputed by the server when available, so the browser only draws
+    if (layout && layout.positions && window.cytoscape) {
+        renderPresetKnowledgeGraph(container, knowledgeGraph, layout);
+        return;
+    }
+
     // Create a container for the nodes
     const nodesContainer = document.createElement('div');
     nodesContainer.className = 'flex flex-wrap gap-4';
@@ -378,5 +558,64 @@ function renderKnowledgeGraph(knowledgeGraph) {
     container.appendChild(nodesContainer);
 }
 
+function renderPresetKnowledgeGraph(container, knowledgeGraph, layout) {
+    const elements = [];
+    Object.keys(knowledgeGraph).forEach((concept) => {
+        elements.push({
+            data: { id: concept, label: concept },
+            position: layout.positions[concept] || { x: 0, y: 0 }
+        });
+        (knowledgeGraph[concept].prerequisites || []).forEach((prerequisite) => {
+            if (knowledgeGraph[prerequisite]) {
+                elements.push({ data: { id: `${prerequisite}->${concept}`, source: prerequisite, target: concept } });
+            }
+        });
+    });
+
+    container.style.height = `${Math.max(400, layout.height + 160)}px`;
+    cytoscape({
+        container: container,
+        elements: elements,
+        layout: { name: 'preset', fit: true, padding: 40 },
+        style: [
+            {
+                selector: 'node',
+                style: {
+                    'label': 'data(label)',
+                    'shape': 'round-rectangle',
+                    'width': 180,
+                    'height': 48,
+                    'background-color': '#ede9fe',
+                    'border-width': 1,
+                    'border-color': '#c4b5fd',
+                    'color': '#6d28d9',
+                    'font-size': 12,
+                    'text-valign': 'center',
+                    'text-halign': 'center',
+                    'text-wrap': 'wrap',
+                    'text-max-width': 170
+                }
+            },
+            {
+                selector: 'edge',
+                style: {
+                    'width': 2,
+                    'line-color': '#a78bfa',
+                    'target-arrow-color': '#a78bfa',
+                    'target-arrow-shape': 'triangle',
+                    'curve-style': 'bezier'
+                }
+            }
+        ]
+    });
+}
+
 // Initial UI render
-updateUI();
\ No newline at end of file
+updateUI();
+
+// Resume the previous session: reload its (cached) knowledge graph, which also restores progress
+if (localStorage.getItem('activeTopic')) {
+    kgTopic = localStorage.getItem('activeTopic');
+    updateUI();
+    generateKnowledgeGraph();
+}
\ No newline at end of file
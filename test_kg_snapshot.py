@@ -0,0 +1,109 @@
+import struct
+import zlib
+
+import pytest
+
+from kg_snapshot import HEADER, KnowledgeGraphSnapshot, SnapshotError, dumps_snapshot, loads_snapshot
+
+GRAPH = {
+    "Linear Algebra": {
+        "prerequisites": [],
+        "resources": [
+            {"type": "book", "title": "Linear Algebra Done Right", "url": "https://example.org/ladr"},
+            {"type": "video", "title": "Essence of Linear Algebra", "url": "https://example.org/essence"},
+        ],
+    },
+    "Machine Learning": {
+        "prerequisites": ["Linear Algebra", "Probability"],
+        "resources": [
+            {"type": "video", "title": "Essence of Linear Algebra", "url": "https://example.org/essence"},
+        ],
+    },
+    "Probability": {"prerequisites": [], "resources": []},
+}
+
+
+def with_crc(snapshot: bytes) -> bytes:
+    # Recomputes the checksum, so a corrupted body is caught by validation rather than the CRC
+    fields = list(HEADER.unpack_from(snapshot))
+    body = snapshot[HEADER.size:]
+    fields[-1] = zlib.crc32(body)
+    return HEADER.pack(*fields) + body
+
+
+def test_round_trip():
+    assert loads_snapshot(dumps_snapshot(GRAPH)) == GRAPH
+
+
+def test_lazy_lookup():
+    snapshot = KnowledgeGraphSnapshot(dumps_snapshot(GRAPH))
+    assert len(snapshot) == 3
+    assert "Probability" in snapshot
+    assert snapshot.concept("Machine Learning") == GRAPH["Machine Learning"]
+    assert snapshot.concept("Calculus") is None
+
+
+def test_extra_fields_round_trip():
+    graph = {
+        "Calculus": {
+            "prerequisites": [],
+            "resources": [{"type": "article", "title": "Limits", "url": "https://example.org/limits", "verified": True}],
+            "difficulty": 3,
+            "description": "Rates of change",
+        },
+    }
+    assert loads_snapshot(dumps_snapshot(graph)) == graph
+
+
+def test_null_and_missing_fields_round_trip():
+    graph = {
+        "Calculus": {
+            "prerequisites": [],
+            "resources": [
+                {"type": "book", "title": "Calculus", "url": None},
+                {"type": "video", "title": "Limits"},
+            ],
+        },
+    }
+    assert loads_snapshot(dumps_snapshot(graph)) == graph
+
+
+def test_empty_graph():
+    assert loads_snapshot(dumps_snapshot({})) == {}
+
+
+def test_truncated_snapshot():
+    snapshot = dumps_snapshot(GRAPH)
+    with pytest.raises(SnapshotError):
+        KnowledgeGraphSnapshot(snapshot[:HEADER.size - 1])
+    with pytest.raises(SnapshotError):
+        KnowledgeGraphSnapshot(with_crc(snapshot[:-8]))
+
+
+def test_bad_magic_and_checksum():
+    snapshot = dumps_snapshot(GRAPH)
+    with pytest.raises(SnapshotError):
+        KnowledgeGraphSnapshot(b"NOTASNAP" + snapshot[8:])
+    corrupted = snapshot[:-1] + bytes([snapshot[-1] ^ 0xFF])
+    with pytest.raises(SnapshotError):
+        KnowledgeGraphSnapshot(corrupted)
+
+
+def test_out_of_range_ids_are_rejected():
+    snapshot = bytearray(dumps_snapshot(GRAPH))
+    n_strings = HEADER.unpack_from(snapshot)[2]
+    # First concept's name string ID sits right after the string offsets and the padded blob
+    offsets_end = HEADER.size + (n_strings + 1) * 4
+    blob_length = struct.unpack_from("<I", snapshot, offsets_end - 4)[0]
+    concepts_start = offsets_end + blob_length + (-blob_length % 4)
+    struct.pack_into("<I", snapshot, concepts_start, n_strings + 5)
+    with pytest.raises(SnapshotError):
+        KnowledgeGraphSnapshot(with_crc(bytes(snapshot)))
+
+
+def test_corrupt_offsets_are_rejected():
+    snapshot = bytearray(dumps_snapshot(GRAPH))
+    # Make the second string offset point past the blob
+    struct.pack_into("<I", snapshot, HEADER.size + 4, 0xFFFF)
+    with pytest.raises(SnapshotError):
+        KnowledgeGraphSnapshot(with_crc(bytes(snapshot)))
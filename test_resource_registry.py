@@ -0,0 +1,37 @@
+import pytest
+
+from kg_ingest import PLACEHOLDER_RESOURCE_URL
+from resource_registry import ResourceRegistry
+
+
+def test_update_metadata_is_shared():
+    registry = ResourceRegistry()
+    resource = registry.intern({"type": "video", "title": "Intro", "url": "https://example.org/intro"})
+    resource_id = registry.id_of(resource)
+    assert registry.update(resource_id, {"verified": True}) is resource
+    assert registry.intern({"type": "video", "title": "Intro", "url": "https://Example.org/intro/"})["verified"] is True
+
+
+def test_update_unknown_resource():
+    assert ResourceRegistry().update(3, {"verified": True}) is None
+
+
+@pytest.mark.parametrize("fields", [
+    {"url": "https://example.org/other"},
+    {"title": "Renamed"},
+    {"type": None},
+    {"resource_id": 1},
+    {"self": 1},
+    {"id": 7},
+    {"verified": "yes"},
+    {"description": {"nested": True}},
+])
+def test_update_rejects_identity_and_unknown_fields(fields):
+    registry = ResourceRegistry()
+    resource = registry.intern({"type": "book", "title": "Placeholder", "url": PLACEHOLDER_RESOURCE_URL})
+    with pytest.raises(ValueError):
+        registry.update(registry.id_of(resource), fields)
+    assert resource == {"type": "book", "title": "Placeholder", "url": PLACEHOLDER_RESOURCE_URL}
+    # The resource still matches its registry key, so interning it again finds the same ID
+    registry.intern({"type": "book", "title": "Placeholder", "url": PLACEHOLDER_RESOURCE_URL})
+    assert len(registry) == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from topic_resolver import TopicResolver, normalize_topic, words_match
+
+
+def resolver_with(*topics):
+    resolver = TopicResolver()
+    for topic in topics:
+        resolver.add_topic(normalize_topic(topic))
+    return resolver
+
+
+@pytest.mark.parametrize("cached, requested", [
+    ("machine learning", "Machine Learnings"),
+    ("reinforcement learning", "reinforcment learning"),
+    ("neural networks", "neural network"),
+])
+def test_resolves_plurals_and_typos_to_cached_topic(cached, requested):
+    resolver = resolver_with(cached)
+    assert resolver.resolve(requested) == (normalize_topic(cached), "similar")
+    # The hit is remembered as an alias
+    assert resolver.resolve(requested) == (normalize_topic(cached), "alias")
+
+
+@pytest.mark.parametrize("cached, requested", [
+    ("unsupervised learning", "supervised learning"),
+    ("supervised learning", "unsupervised learning"),
+    ("linear algebra", "nonlinear algebra"),
+    ("organic chemistry 1", "organic chemistry 2"),
+    ("calculus 2", "calculus 3"),
+    ("python 2", "python 3"),
+    ("c++ programming", "c# programming"),
+    ("machine learning", "machine learning ops"),
+])
+def test_does_not_merge_topics_with_different_meaning(cached, requested):
+    resolver = resolver_with(cached)
+    assert resolver.resolve(requested) == (normalize_topic(requested), "new")
+    assert normalize_topic(requested) not in resolver.aliases
+
+
+def test_exact_and_normalized_matches():
+    resolver = resolver_with("machine learning")
+    assert resolver.resolve("machine learning") == ("machine learning", "exact")
+    assert resolver.resolve("Intro to ML") == ("machine learning", "exact")
+
+
+def test_words_match():
+    assert words_match("network", "networks")
+    assert words_match("probability", "probabilty")
+    assert words_match("theory", "theories")
+    assert not words_match("1", "2")
+    assert not words_match("supervised", "unsupervised")
+    assert not words_match("go", "r")
@@ -0,0 +1,167 @@
+import re
+import threading
+from collections import defaultdict
+
+# Abbreviations expanded token by token before topics are compared
+TOPIC_ALIASES = {
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "rl": "reinforcement learning",
+    "ds": "data science",
+    "llm": "large language models",
+    "llms": "large language models",
+}
+
+# Words that describe the level or format of a topic rather than the topic itself
+FILLER_WORDS = {
+    "a", "an", "the", "to", "of", "for", "and", "in", "on",
+    "intro", "introduction", "introductory", "basic", "basics", "fundamentals", "beginner", "beginners",
+    "guide", "course", "tutorial", "overview", "learn",
+}
+
+# Minimum character-trigram Jaccard similarity for two topics to share a cached graph
+SIMILARITY_THRESHOLD = 0.75
+
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9+#]+")
+
+# Prefixes that negate a word: "unsupervised" is not a typo of "supervised"
+NEGATING_PREFIXES = ("un", "non", "in", "im", "il", "ir", "dis", "anti", "a")
+
+# Words shorter than this must match exactly (or as a plural); longer ones tolerate typos
+MIN_TYPO_WORD_LENGTH = 4
+LONG_WORD_LENGTH = 8
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Normalizes a topic to its comparison form, e.g. "Intro to Machine-Learning" and "ML"
+    both become "machine learning".
+    """
+    tokens = []
+    for token in NON_WORD_PATTERN.sub(" ", str(topic).lower()).split():
+        expanded = TOPIC_ALIASES.get(token, token)
+        tokens.extend(word for word in expanded.split() if word not in FILLER_WORDS)
+    if not tokens:
+        # A topic made only of filler words is still a topic; keep it rather than collapsing to ""
+        return " ".join(NON_WORD_PATTERN.sub(" ", str(topic).lower()).split())
+    return " ".join(tokens)
+
+
+def trigrams(text: str) -> set:
+    """
+    Character trigrams of the text, padded so that short topics still produce some.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between two words, or limit + 1 once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def words_match(a: str, b: str) -> bool:
+    """
+    Whether two topic words name the same thing: equal, a plural of one another, or a
+    small typo apart. Numbers ("chemistry 1" vs "chemistry 2"), symbols ("c++" vs "c#")
+    and negations ("supervised" vs "unsupervised") must match exactly.
+    """
+    if a == b:
+        return True
+    if not (a.isalpha() and b.isalpha()):
+        return False
+    shorter, longer = sorted((a, b), key=len)
+    if longer in (shorter + "s", shorter + "es") or (shorter.endswith("y") and longer == shorter[:-1] + "ies"):
+        return True
+    if any(longer.startswith(prefix) and words_match(longer[len(prefix):], shorter) for prefix in NEGATING_PREFIXES):
+        return False
+    if len(shorter) < MIN_TYPO_WORD_LENGTH:
+        return False
+    limit = 2 if len(shorter) >= LONG_WORD_LENGTH else 1
+    return edit_distance(a, b, limit) <= limit
+
+
+class TopicResolver:
+    """
+    Maps requested topics onto topics that already have a cached knowledge graph.
+    Resolution tries, in order: the normalized form, the learned alias table, then
+    character-trigram similarity against known topics (via an inverted trigram index,
+    so only topics sharing trigrams are scored). A similar topic must also match word
+    for word, see words_match().
+    Near-duplicate hits are remembered as aliases, so they cost a dict lookup next time.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self.topics = {}  # canonical topic -> trigram set
+        self.aliases = {}  # normalized topic -> canonical topic
+        self.trigram_index = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def add_topic(self, canonical: str):
+        """
+        Registers a topic that now has a cached knowledge graph.
+        """
+        with self.lock:
+            if canonical in self.topics:
+                return
+            grams = trigrams(canonical)
+            self.topics[canonical] = grams
+            for gram in grams:
+                self.trigram_index[gram].add(canonical)
+
+    def add_alias(self, topic: str, canonical: str):
+        """
+        Adds an entry to the alias table, mapping topic onto a canonical topic.
+        """
+        with self.lock:
+            self.aliases[normalize_topic(topic)] = canonical
+
+    def resolve(self, topic: str) -> tuple:
+        """
+        Returns (canonical_topic, match) where match is "exact", "alias", "similar" or "new".
+        For "new" topics the canonical topic is the normalized form of the request.
+        """
+        normalized = normalize_topic(topic)
+        with self.lock:
+            if normalized in self.topics:
+                return normalized, "exact"
+            if normalized in self.aliases:
+                return self.aliases[normalized], "alias"
+
+            grams = trigrams(normalized)
+            overlap = defaultdict(int)
+            for gram in grams:
+                for candidate in self.trigram_index.get(gram, ()):
+                    overlap[candidate] += 1
+
+            # Extra qualifier words ("machine learning ops") change the subject, while typos and
+            # plurals ("machine learnings") do not, so only topics whose words pair up compete
+            words = normalized.split()
+            best, best_score = None, 0.0
+            for candidate, shared in overlap.items():
+                score = shared / (len(grams) + len(self.topics[candidate]) - shared)
+                if score < self.threshold or score <= best_score:
+                    continue
+                candidate_words = candidate.split()
+                if len(candidate_words) == len(words) and all(map(words_match, words, candidate_words)):
+                    best, best_score = candidate, score
+            if best is not None:
+                self.aliases[normalized] = best
+                return best, "similar"
+        return normalized, "new"
@@ -0,0 +1,261 @@
+"""
+Opt-in per-request tracing.
+
+A request is traced when it carries an `X-Trace: 1` header or is picked by the
+`TRACE_SAMPLE_RATE` sampling rate. `X-Trace: profile` also captures a cProfile dump,
+but only on servers started with `TRACE_PROFILE_ENABLED=1`; at most
+`TRACE_PROFILE_MAX_FILES` dumps are kept.
+Code marks phases with `with span("name"):`; outside a traced request span() returns
+a shared no-op object, so untraced requests pay one context variable lookup per span.
+
+Traced responses carry `X-Trace-Id` and `Server-Timing` headers. The slowest recent
+traces are listed at /debug/traces, which only exists with `TRACE_DEBUG_ENDPOINTS=1`.
+"""
+import cProfile
+import contextvars
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+
+from flask import jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+TRACE_HEADER = "X-Trace"
+# Fraction of requests traced without the header (0 disables sampling)
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+# Whether clients may ask for cProfile captures; profiling is slow and writes to disk
+TRACE_PROFILE_ENABLED = _env_flag("TRACE_PROFILE_ENABLED")
+# Where cProfile captures are written, one <trace_id>.prof file per profiled request
+TRACE_PROFILE_DIR = os.environ.get("TRACE_PROFILE_DIR", "profiles")
+# Captures kept in TRACE_PROFILE_DIR; the oldest are deleted beyond this
+TRACE_PROFILE_MAX_FILES = int(os.environ.get("TRACE_PROFILE_MAX_FILES", "50"))
+# Whether the /debug/* endpoints are registered; they expose request paths and timings
+TRACE_DEBUG_ENDPOINTS = _env_flag("TRACE_DEBUG_ENDPOINTS")
+# How many finished traces are kept for /debug/traces
+TRACE_HISTORY_SIZE = 200
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+recent_traces = deque(maxlen=TRACE_HISTORY_SIZE)
+recent_traces_lock = threading.Lock()
+
+# cProfile hooks the whole thread, so only one request is profiled at a time
+profile_lock = threading.Lock()
+
+
+class Span:
+    """
+    Times one phase of a traced request. Extra attributes (e.g. the cache tier
+    that served a lookup) can be attached with set().
+    """
+
+    __slots__ = ("trace", "record", "started")
+
+    def __init__(self, trace: dict, name: str, attributes: dict):
+        self.trace = trace
+        self.record = {"name": name, **attributes}
+
+    def set(self, **attributes):
+        self.record.update(attributes)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = time.perf_counter()
+        self.record["start_ms"] = round((self.started - self.trace["_started"]) * 1000, 3)
+        self.record["duration_ms"] = round((ended - self.started) * 1000, 3)
+        if exc_type is not None:
+            self.record["error"] = exc_type.__name__
+        self.trace["spans"].append(self.record)
+        return False
+
+
+class _NullSpan:
+    """
+    Returned by span() outside traced requests; every operation is a no-op.
+    """
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **attributes):
+    """
+    Returns a context manager timing a phase of the current request's trace.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return NULL_SPAN
+    return Span(trace, name, attributes)
+
+
+def tracing_active() -> bool:
+    return _current_trace.get() is not None
+
+
+def start_trace(method: str, path: str, profile: bool = False) -> dict:
+    """
+    Starts a trace for the current context, optionally with a cProfile capture.
+    """
+    trace = {
+        "trace_id": uuid.uuid4().hex,
+        "method": method,
+        "path": path,
+        "status": None,
+        "started_at": time.time(),
+        "duration_ms": None,
+        "spans": [],
+        "profile": None,
+        "_started": time.perf_counter(),
+        "_profiler": None,
+        "_token": None,
+    }
+    if profile and profile_lock.acquire(blocking=False):
+        trace["_profiler"] = cProfile.Profile()
+        trace["_profiler"].enable()
+    trace["_token"] = _current_trace.set(trace)
+    return trace
+
+
+def finish_trace(trace: dict, status: int = None):
+    """
+    Ends a trace: stops and dumps its profile, records it for /debug/traces and
+    detaches it from the current context. Safe to call more than once.
+    """
+    if trace["duration_ms"] is not None:
+        return
+    trace["duration_ms"] = round((time.perf_counter() - trace["_started"]) * 1000, 3)
+    trace["status"] = status
+
+    profiler = trace["_profiler"]
+    if profiler is not None:
+        profiler.disable()
+        try:
+            os.makedirs(TRACE_PROFILE_DIR, exist_ok=True)
+            trace["profile"] = os.path.join(TRACE_PROFILE_DIR, f"{trace['trace_id']}.prof")
+            profiler.dump_stats(trace["profile"])
+            prune_profiles(TRACE_PROFILE_MAX_FILES)
+        except OSError as e:
+            print(f"Failed to write profile for trace {trace['trace_id']}: {e}")
+            trace["profile"] = None
+        finally:
+            profile_lock.release()
+
+    try:
+        _current_trace.reset(trace["_token"])
+    except ValueError:
+        # Finished from a different context than it was started in
+        _current_trace.set(None)
+
+    with recent_traces_lock:
+        recent_traces.append({k: v for k, v in trace.items() if not k.startswith("_")})
+
+
+def prune_profiles(max_files: int):
+    """
+    Deletes the oldest profile captures in TRACE_PROFILE_DIR beyond max_files.
+    """
+    paths = [entry.path for entry in os.scandir(TRACE_PROFILE_DIR) if entry.name.endswith(".prof") and entry.is_file()]
+    if len(paths) <= max_files:
+        return
+    paths.sort(key=os.path.getmtime)
+    for path in paths[:len(paths) - max_files]:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"Failed to delete old profile {path}: {e}")
+
+
+def slowest_traces(limit: int = 20) -> list:
+    """
+    Returns up to `limit` of the recent traces, slowest first.
+    """
+    with recent_traces_lock:
+        traces = list(recent_traces)
+    return sorted(traces, key=lambda t: t["duration_ms"], reverse=True)[:limit]
+
+
+def server_timing_header(trace: dict) -> str:
+    return ", ".join(f"{s['name']};dur={s['duration_ms']}" for s in trace["spans"])
+
+
+class TracedJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that records response serialization (jsonify) as a span.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with span("serialize_response"):
+            return super().dumps(obj, **kwargs)
+
+
+def install_tracing(app):
+    """
+    Adds per-request tracing hooks to a Flask app, and the /debug/traces endpoint
+    when TRACE_DEBUG_ENDPOINTS is set.
+    """
+    app.json = TracedJSONProvider(app)
+
+    @app.before_request
+    def begin_request_trace():
+        mode = request.headers.get(TRACE_HEADER, "").strip().lower()
+        sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+        if not (mode or sampled) or mode in ("0", "off") or request.path.startswith("/debug/"):
+            return
+        trace = start_trace(request.method, request.path, profile=(mode == "profile" and TRACE_PROFILE_ENABLED))
+        if request.is_json:
+            # Flask caches the parsed body, so the view's get_json() is free afterwards
+            with span("parse_request"):
+                request.get_json(silent=True)
+        request.environ["trace"] = trace
+
+    @app.after_request
+    def end_request_trace(response):
+        trace = request.environ.get("trace")
+        if trace is not None:
+            finish_trace(trace, response.status_code)
+            response.headers["X-Trace-Id"] = trace["trace_id"]
+            response.headers["Server-Timing"] = server_timing_header(trace)
+        return response
+
+    @app.teardown_request
+    def discard_request_trace(exc):
+        # after_request does not run when the view raised
+        trace = request.environ.pop("trace", None)
+        if trace is not None:
+            finish_trace(trace, 500)
+
+    if not TRACE_DEBUG_ENDPOINTS:
+        return
+
+    @app.route('/debug/traces', methods=['GET'])
+    def debug_traces_endpoint():
+        """
+        Lists the slowest recent traces with their phase breakdown.
+        """
+        try:
+            limit = max(1, min(int(request.args.get('limit', 20)), TRACE_HISTORY_SIZE))
+        except ValueError:
+            limit = 20
+        return jsonify({"traces": slowest_traces(limit)})